@@ -1,9 +1,25 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from espn_api.football import League
+from espn_api.football.player import Player
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import requests
+import threading
+import time
+from espn_api.requests import espn_requests
+from resilience import (
+    UpstreamError, UpstreamThrottled, UpstreamUnavailable, UpstreamRejected, CircuitOpenError,
+    espn_breaker, gemini_breaker, upstream_call, is_outage_error, is_throttle_error,
+    is_throttle_response,
+)
+from metrics import init_app as init_metrics, timed, record_cache
+from responses import init_app as init_responses, parse_projection, player_list
+from crawler import FreeAgentCrawler, fetch_free_agent_page
+from live import LiveScoringState
+from player_search import MIN_QUERY_LENGTH, PlayerSearchIndex, normalize_name
+from refresher import BackgroundRefresher
+from player_aggregates import PlayerAggregates
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,6 +31,12 @@ app = Flask(__name__)
 allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:8080,https://fantasy-assistant-production.up.railway.app').split(',')
 CORS(app, resources={r"/api/*": {"origins": allowed_origins}})
 
+# Per-phase timing (Server-Timing header) and Prometheus metrics on /metrics
+init_metrics(app)
+
+# orjson encoding for every route, content-hash ETags (304 on If-None-Match) and gzip/brotli
+init_responses(app)
+
 # Default credentials (can be overridden via request headers or environment)
 # NOTE: These are placeholder values. In production, always use environment variables.
 YOUR_LEAGUE_ID = int(os.getenv('ESPN_LEAGUE_ID', 0))
@@ -23,6 +45,69 @@ YOUR_YEAR = int(os.getenv('ESPN_YEAR', 2025))
 YOUR_ESPN_S2 = os.getenv('ESPN_S2', '')
 YOUR_SWID = os.getenv('ESPN_SWID', '')
 
+# Upstream base URLs (override to point the service at local stub servers)
+ESPN_API_BASE = os.getenv('ESPN_API_BASE')
+GEMINI_API_BASE = os.getenv('GEMINI_API_BASE', 'https://generativelanguage.googleapis.com')
+if ESPN_API_BASE:
+    espn_requests.FANTASY_BASE_ENDPOINT = ESPN_API_BASE.rstrip('/') + '/'
+ESPN_PREFLIGHT_BASE = (ESPN_API_BASE or 'https://fantasy.espn.com/apis/v3/games').rstrip('/')
+
+# League construction issues several GETs inside espn-api, so it costs more tokens
+LEAGUE_REQUEST_COST = int(os.getenv('ESPN_LEAGUE_REQUEST_COST', 3))
+
+# Last good League per credential set, served while ESPN is throttling us or down
+LEAGUE_STALE_TTL = float(os.getenv('ESPN_LEAGUE_STALE_TTL', 600))
+league_cache = {}
+league_cache_lock = threading.Lock()
+
+# Shared session so preflight GETs reuse connections
+http_session = requests.Session()
+
+# Full-pool free-agent scans (?scan=full): page size, parallelism and reuse window
+FREE_AGENT_PAGE_SIZE = int(os.getenv('FREE_AGENT_PAGE_SIZE', 100))
+FREE_AGENT_SCAN_WORKERS = int(os.getenv('FREE_AGENT_SCAN_WORKERS', 4))
+FREE_AGENT_SCAN_TTL = float(os.getenv('FREE_AGENT_SCAN_TTL', 300))
+FREE_AGENT_SCAN_MAX_PAGES = int(os.getenv('FREE_AGENT_SCAN_MAX_PAGES', 50))
+# Keep the blocking wait below the gunicorn worker --timeout; longer scans should use stream=1
+FREE_AGENT_SCAN_TIMEOUT = float(os.getenv('FREE_AGENT_SCAN_TIMEOUT', 20))
+free_agent_crawls = {}
+free_agent_crawls_lock = threading.Lock()
+
+# Live scoring feed: box-score refresh interval, SSE connection length and concurrency
+# caps (both must stay below the gunicorn timeout/threads, see gunicorn.conf.py), idle eviction
+LIVE_REFRESH_INTERVAL = float(os.getenv('LIVE_REFRESH_INTERVAL', 15))
+LIVE_SSE_MAX_SECONDS = float(os.getenv('LIVE_SSE_MAX_SECONDS', 90))
+LIVE_SSE_MAX_STREAMS = int(os.getenv('LIVE_SSE_MAX_STREAMS', 8))
+live_sse_slots = threading.BoundedSemaphore(LIVE_SSE_MAX_STREAMS)
+LIVE_STATE_IDLE_TTL = float(os.getenv('LIVE_STATE_IDLE_TTL', 3600))
+# How often a live state re-reads the league's current week (weeks roll over under active pollers)
+LIVE_LEAGUE_MAX_AGE = float(os.getenv('LIVE_LEAGUE_MAX_AGE', 900))
+live_states = {}
+live_states_lock = threading.Lock()
+
+# Fuzzy player-name search over nflverse roster files, rebuilt on a background thread
+# whenever a file changes; requests wait at most NFLVERSE_LOAD_WAIT for the first build
+NFLVERSE_CACHE_DIR = os.getenv('NFLVERSE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'nflverse_cache'))
+NFLVERSE_LOAD_WAIT = float(os.getenv('NFLVERSE_LOAD_WAIT', 10))
+player_index = BackgroundRefresher(
+    'Player search index',
+    PlayerSearchIndex(NFLVERSE_CACHE_DIR, patterns=('roster_*.parquet',)),
+    interval=float(os.getenv('PLAYER_INDEX_REFRESH', 300)),
+).start()
+
+# Per-player season aggregates precomputed from the weekly stats and NGS files
+player_aggregates = BackgroundRefresher(
+    'Player aggregates',
+    PlayerAggregates(NFLVERSE_CACHE_DIR),
+    interval=float(os.getenv('PLAYER_AGGREGATES_REFRESH', 300)),
+).start()
+
+# Fields selectable with ?fields= on the player-list endpoints
+ROSTER_FIELDS = ('name', 'position', 'proTeam', 'lineupSlot', 'projectedPoints', 'points',
+                 'injured', 'injuryStatus')
+FREE_AGENT_FIELDS = ('name', 'position', 'proTeam', 'projectedPoints', 'points', 'injured',
+                     'injuryStatus', 'playerId', 'percentOwned', 'percentStarted')
+
 def normalize_swid(swid):
     """Normalize SWID format - espn-api library expects curly brackets"""
     if not swid:
@@ -55,8 +140,42 @@ def get_league_and_team(espn_s2=None, swid=None, league_id=None, team_id=None, y
     print(f"ESPNS2 length: {len(espn_s2)}, SWID format: {swid[:20]}...{swid[-5:] if len(swid) > 25 else swid}")
     print(f"SWID starts with {{: {swid.startswith('{')}, ends with }}: {swid.endswith('}')}")
     
+    cache_key = (league_id, team_id, year, espn_s2, swid)
+    try:
+        league = fetch_league(espn_s2, swid, league_id, year)
+    except UpstreamError as e:
+        with league_cache_lock:
+            cached = league_cache.get(cache_key)
+        fresh_enough = cached is not None and time.monotonic() - cached[2] < LEAGUE_STALE_TTL
+        record_cache('league_stale', fresh_enough)
+        if fresh_enough:
+            print(f"ESPN call failed ({e}); serving cached league {league_id}")
+            return cached[0], cached[1], None
+        raise
+    
+    team = None
+    for t in league.teams:
+        if t.team_id == team_id:
+            team = t
+            break
+    
+    if not team:
+        return None, None, f'Team with ID {team_id} not found in league {league_id}'
+    
+    with league_cache_lock:
+        now = time.monotonic()
+        # Entries past the stale window can never be served again; drop them so
+        # each distinct credential set doesn't keep a League alive forever
+        for stale_key in [k for k, entry in league_cache.items() if now - entry[2] >= LEAGUE_STALE_TTL]:
+            del league_cache[stale_key]
+        league_cache[cache_key] = (league, team, now)
+    
+    return league, team, None
+
+def fetch_league(espn_s2, swid, league_id, year):
+    """Preflight the credentials and construct the League through the limiter and breaker"""
     # Try direct HTTP first to verify credentials work
-    test_url = f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{year}/segments/0/leagues/{league_id}"
+    test_url = f"{ESPN_PREFLIGHT_BASE}/ffl/seasons/{year}/segments/0/leagues/{league_id}"
     cookies = {'swid': swid, 'espn_s2': espn_s2}
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -67,50 +186,69 @@ def get_league_and_team(espn_s2=None, swid=None, league_id=None, team_id=None, y
     }
     
     # Verify credentials work with direct HTTP
-    test_resp = requests.get(test_url, cookies=cookies, headers=headers, timeout=10)
-    if test_resp.status_code != 200:
-        raise Exception(f"ESPN API returned status {test_resp.status_code}. Credentials may be invalid.")
+    with upstream_call(espn_breaker, test_url):
+        try:
+            with timed('espn_preflight'):
+                test_resp = http_session.get(test_url, cookies=cookies, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            raise UpstreamUnavailable(f"ESPN unreachable: {e}")
+        if is_throttle_response(test_resp):
+            raise UpstreamThrottled(
+                f"ESPN is throttling requests (HTTP {test_resp.status_code})",
+                retry_after=test_resp.headers.get('Retry-After'),
+            )
+        if 400 <= test_resp.status_code < 500:
+            raise UpstreamRejected(f"ESPN API returned status {test_resp.status_code}. Credentials may be invalid.")
+        if test_resp.status_code >= 500:
+            raise UpstreamUnavailable(f"ESPN API returned status {test_resp.status_code}")
+        if test_resp.status_code != 200:
+            raise Exception(f"ESPN API returned status {test_resp.status_code}")
     
     print("Direct HTTP test passed - credentials are valid. Using espn-api library...")
     
-    try:
-        league = League(
-            league_id=league_id,
-            year=year,
-            espn_s2=espn_s2,
-            swid=swid
-        )
-    except Exception as e:
-        error_msg = str(e)
-        error_type = type(e).__name__
-        print(f"ESPN League initialization error (type: {error_type}): {error_msg}")
-        print(f"Full error details: {repr(e)}")
-        
-        # Since direct HTTP test passed, the library has an issue
-        # Check if it's a 403 error from the library
-        if '403' in error_msg or 'Forbidden' in error_msg:
-            print("=" * 60)
-            print("WARNING: espn-api library returned 403, but direct HTTP test passed!")
-            print("This indicates a bug or incompatibility with the espn-api library.")
-            print("Attempting to use direct HTTP requests as fallback...")
-            print("=" * 60)
-            # We'll handle this in the calling code by using direct HTTP
-            raise Exception("ESPN library error: Direct HTTP works but library fails. This may be a library version issue.")
-        elif '401' in error_msg or 'Unauthorized' in error_msg:
-            raise Exception("ESPN returned HTTP 401: Your credentials are invalid.")
-        else:
-            raise Exception(f"ESPN API error: {error_msg}")
-    
-    team = None
-    for t in league.teams:
-        if t.team_id == team_id:
-            team = t
-            break
-    
-    if not team:
-        return None, None, f'Team with ID {team_id} not found in league {league_id}'
+    with upstream_call(espn_breaker, espn_requests.FANTASY_BASE_ENDPOINT, tokens=LEAGUE_REQUEST_COST):
+        try:
+            with timed('league_init'):
+                league = League(
+                    league_id=league_id,
+                    year=year,
+                    espn_s2=espn_s2,
+                    swid=swid
+                )
+        except Exception as e:
+            error_msg = str(e)
+            error_type = type(e).__name__
+            print(f"ESPN League initialization error (type: {error_type}): {error_msg}")
+            print(f"Full error details: {repr(e)}")
+            
+            # The preflight with these same credentials just passed, so a 403/429
+            # from the library means ESPN is throttling us, not an auth failure
+            if is_throttle_error(e):
+                raise UpstreamThrottled("ESPN throttled League initialization after credentials were verified")
+            elif is_outage_error(e):
+                raise UpstreamUnavailable(f"ESPN unavailable during League initialization: {error_msg}")
+            elif '401' in error_msg or 'Unauthorized' in error_msg:
+                raise UpstreamRejected("ESPN returned HTTP 401: Your credentials are invalid.")
+            else:
+                raise Exception(f"ESPN API error: {error_msg}")
     
-    return league, team, None
+    return league
+
+UPSTREAM_ERROR_MESSAGES = {
+    UpstreamThrottled: 'Upstream service is rate limiting requests',
+    UpstreamUnavailable: 'Upstream service is unavailable',
+    CircuitOpenError: 'Upstream service is failing and calls are paused',
+}
+
+def upstream_error_response(e):
+    """503 for upstream throttling or outages so callers don't mistake them for expired credentials"""
+    retry_after = str(e.retry_after or 30)
+    return jsonify({
+        'error': f'{UPSTREAM_ERROR_MESSAGES[type(e)]}, please retry shortly. ({e})',
+        'throttled': isinstance(e, UpstreamThrottled),
+        'unavailable': isinstance(e, UpstreamUnavailable),
+        'circuitOpen': isinstance(e, CircuitOpenError),
+    }), 503, {'Retry-After': retry_after}
 
 @app.route('/api/espn/roster', methods=['GET'])
 def get_my_roster():
@@ -139,6 +277,11 @@ def get_my_roster():
         if not league_id_str or not team_id_str or not year_str:
             return jsonify({'error': 'Missing league/team/year information'}), 400
         
+        try:
+            fields, fmt = parse_projection(ROSTER_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Convert to appropriate types
         try:
             league_id = int(league_id_str)
@@ -162,37 +305,42 @@ def get_my_roster():
         
         # Create roster data list with projected and actual points
         roster_data = []
-        for player in team.roster:
-            # Get projected points for current week
-            projected = 0
-            actual = 0
-            try:
-                if hasattr(player, 'stats') and current_week in player.stats:
-                    projected = player.stats[current_week].get('projected_points', 0)
-                    actual = player.stats[current_week].get('points', 0)
-                # Fallback to season averages
-                if projected == 0:
+        with timed('transform'):
+            for player in team.roster:
+                # Get projected points for current week
+                projected = 0
+                actual = 0
+                try:
+                    if hasattr(player, 'stats') and current_week in player.stats:
+                        projected = player.stats[current_week].get('projected_points', 0)
+                        actual = player.stats[current_week].get('points', 0)
+                    # Fallback to season averages
+                    if projected == 0:
+                        projected = getattr(player, 'projected_avg_points', 0)
+                    if actual == 0:
+                        actual = getattr(player, 'avg_points', 0)
+                except:
                     projected = getattr(player, 'projected_avg_points', 0)
-                if actual == 0:
                     actual = getattr(player, 'avg_points', 0)
-            except:
-                projected = getattr(player, 'projected_avg_points', 0)
-                actual = getattr(player, 'avg_points', 0)
             
-            player_data = {
-                'name': player.name,
-                'position': player.position,
-                'proTeam': player.proTeam,
-                'lineupSlot': player.lineupSlot,
-                'projectedPoints': projected,
-                'points': actual,
-                'injured': getattr(player, 'injured', False),
-                'injuryStatus': getattr(player, 'injuryStatus', None),
-            }
-            roster_data.append(player_data)
-        
-        return jsonify(roster_data)
+                player_data = {
+                    'name': player.name,
+                    'position': player.position,
+                    'proTeam': player.proTeam,
+                    'lineupSlot': player.lineupSlot,
+                    'projectedPoints': projected,
+                    'points': actual,
+                    'injured': getattr(player, 'injured', False),
+                    'injuryStatus': getattr(player, 'injuryStatus', None),
+                }
+                roster_data.append(player_data)
+        
+        with timed('json_encode'):
+            response = player_list(roster_data, fields, fmt)
+        return response
     
+    except UpstreamError as e:
+        return upstream_error_response(e)
     except Exception as e:
         error_msg = str(e)
         print(f"ESPN roster endpoint error: {error_msg}")
@@ -245,30 +393,31 @@ def optimize_lineup():
         
         # Get all players with their projections
         players = []
-        for player in team.roster:
-            projected = 0
-            try:
-                if hasattr(player, 'stats') and current_week in player.stats:
-                    projected = player.stats[current_week].get('projected_points', 0)
-                if projected == 0:
+        with timed('transform'):
+            for player in team.roster:
+                projected = 0
+                try:
+                    if hasattr(player, 'stats') and current_week in player.stats:
+                        projected = player.stats[current_week].get('projected_points', 0)
+                    if projected == 0:
+                        projected = getattr(player, 'projected_avg_points', 0)
+                except:
                     projected = getattr(player, 'projected_avg_points', 0)
-            except:
-                projected = getattr(player, 'projected_avg_points', 0)
             
-            players.append({
-                'name': player.name,
-                'position': player.position,
-                'proTeam': player.proTeam,
-                'lineupSlot': player.lineupSlot,
-                'eligibleSlots': player.eligibleSlots,
-                'projectedPoints': projected,
-                'injured': getattr(player, 'injured', False),
-                'injuryStatus': getattr(player, 'injuryStatus', None),
-                'playerId': getattr(player, 'playerId', None)
-            })
-        
-        # Sort by projected points (highest first)
-        players.sort(key=lambda x: x['projectedPoints'], reverse=True)
+                players.append({
+                    'name': player.name,
+                    'position': player.position,
+                    'proTeam': player.proTeam,
+                    'lineupSlot': player.lineupSlot,
+                    'eligibleSlots': player.eligibleSlots,
+                    'projectedPoints': projected,
+                    'injured': getattr(player, 'injured', False),
+                    'injuryStatus': getattr(player, 'injuryStatus', None),
+                    'playerId': getattr(player, 'playerId', None)
+                })
+        
+            # Sort by projected points (highest first)
+            players.sort(key=lambda x: x['projectedPoints'], reverse=True)
         
         # Define lineup requirements (typical ESPN lineup)
         lineup_slots = {
@@ -311,12 +460,16 @@ def optimize_lineup():
                     player['recommendedSlot'] = 'BE'
                     benched.append(player)
         
-        return jsonify({
-            'optimalLineup': optimal_lineup,
-            'bench': benched,
-            'totalProjected': sum(p['projectedPoints'] for p in optimal_lineup)
-        })
+        with timed('json_encode'):
+            response = jsonify({
+                'optimalLineup': optimal_lineup,
+                'bench': benched,
+                'totalProjected': sum(p['projectedPoints'] for p in optimal_lineup)
+            })
+        return response
     
+    except UpstreamError as e:
+        return upstream_error_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -337,6 +490,11 @@ def get_free_agents():
         if not league_id_str or not team_id_str or not year_str:
             return jsonify({'error': 'Missing league/team/year information'}), 400
         
+        try:
+            fields, fmt = parse_projection(FREE_AGENT_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Normalize SWID format (espn-api expects curly brackets)
         swid = normalize_swid(swid)
         
@@ -347,6 +505,42 @@ def get_free_agents():
         except ValueError as e:
             return jsonify({'error': f'Invalid league/team/year format: {str(e)}'}), 400
         
+        # Get query parameters
+        position = request.args.get('position', None)  # Filter by position (QB, RB, WR, TE, K, D/ST)
+        size = int(request.args.get('size', 50))  # Number of results (default 50)
+        
+        # Handle empty string as None
+        if position == '':
+            position = None
+        
+        # Full-pool scan: parallel paginated crawl across every position
+        if request.args.get('scan') == 'full':
+            stream = request.args.get('stream') in ('1', 'true')
+            if stream and (fmt != 'rows' or 'size' in request.args):
+                return jsonify({'error': 'stream=1 sends NDJSON rows in crawl order; size and format are not supported with it'}), 400
+            crawl, error = get_free_agent_crawl(espn_s2, swid, league_id, team_id, year)
+            if error:
+                return jsonify({'error': error}), 404
+            if stream:
+                return stream_free_agent_crawl(crawl, fields, position)
+            try:
+                with timed('free_agent_crawl'):
+                    crawl.wait(timeout=FREE_AGENT_SCAN_TIMEOUT)
+            except TimeoutError as e:
+                return jsonify({'error': f'{e}. Retry shortly or use stream=1 to receive players as they arrive.'}), 504
+            free_agent_data = crawl.snapshot()
+            if position:
+                free_agent_data = [p for p in free_agent_data if p['position'] == position]
+            free_agent_data.sort(key=lambda p: p['percentOwned'], reverse=True)
+            if 'size' in request.args:
+                free_agent_data = free_agent_data[:size]
+            with timed('json_encode'):
+                response = player_list(free_agent_data, fields, fmt, wrap=lambda players: {
+                    'players': players,
+                    'count': len(free_agent_data)
+                })
+            return response
+        
         league, team, error = get_league_and_team(
             espn_s2=espn_s2,
             swid=swid,
@@ -357,64 +551,234 @@ def get_free_agents():
         if error:
             return jsonify({'error': error}), 404
         
-        # Get query parameters
-        position = request.args.get('position', None)  # Filter by position (QB, RB, WR, TE, K, D/ST)
-        size = int(request.args.get('size', 50))  # Number of results (default 50)
-        
-        # Handle empty string as None
-        if position == '':
-            position = None
-        
         current_week = league.current_week
         
         # Get free agents from the league
         # ESPN API provides free_agents method
-        free_agents = league.free_agents(size=size, position=position)
+        with upstream_call(espn_breaker, espn_requests.FANTASY_BASE_ENDPOINT):
+            try:
+                with timed('espn_free_agents'):
+                    free_agents = league.free_agents(size=size, position=position)
+            except Exception as e:
+                if is_throttle_error(e):
+                    raise UpstreamThrottled(f"ESPN throttled free agents: {e}")
+                if is_outage_error(e):
+                    raise UpstreamUnavailable(f"ESPN unavailable for free agents: {e}")
+                raise
         
         # Process free agent data
-        free_agent_data = []
-        for player in free_agents:
-            projected = 0
-            actual = 0
-            try:
-                if hasattr(player, 'stats') and current_week in player.stats:
-                    projected = player.stats[current_week].get('projected_points', 0)
-                    actual = player.stats[current_week].get('points', 0)
-                if projected == 0:
-                    projected = getattr(player, 'projected_avg_points', 0)
-                if actual == 0:
-                    actual = getattr(player, 'avg_points', 0)
-            except:
-                projected = getattr(player, 'projected_avg_points', 0)
-                actual = getattr(player, 'avg_points', 0)
-            
-            player_data = {
-                'name': player.name,
-                'position': player.position,
-                'proTeam': player.proTeam,
-                'projectedPoints': projected,
-                'points': actual,
-                'injured': getattr(player, 'injured', False),
-                'injuryStatus': getattr(player, 'injuryStatus', 'ACTIVE'),
-                'playerId': getattr(player, 'playerId', None),
-                'percentOwned': getattr(player, 'percent_owned', 0),
-                'percentStarted': getattr(player, 'percent_started', 0),
-            }
-            free_agent_data.append(player_data)
+        with timed('transform'):
+            free_agent_data = [free_agent_row(player, current_week) for player in free_agents]
         
-        return jsonify({
-            'players': free_agent_data,
-            'count': len(free_agent_data)
-        })
+        with timed('json_encode'):
+            response = player_list(free_agent_data, fields, fmt, wrap=lambda players: {
+                'players': players,
+                'count': len(free_agent_data)
+            })
+        return response
     
+    except UpstreamError as e:
+        return upstream_error_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def free_agent_row(player, current_week):
+    """Shape an espn-api player into the free-agent response row"""
+    projected = 0
+    actual = 0
+    try:
+        if hasattr(player, 'stats') and current_week in player.stats:
+            projected = player.stats[current_week].get('projected_points', 0)
+            actual = player.stats[current_week].get('points', 0)
+        if projected == 0:
+            projected = getattr(player, 'projected_avg_points', 0)
+        if actual == 0:
+            actual = getattr(player, 'avg_points', 0)
+    except:
+        projected = getattr(player, 'projected_avg_points', 0)
+        actual = getattr(player, 'avg_points', 0)
+    
+    return {
+        'name': player.name,
+        'position': player.position,
+        'proTeam': player.proTeam,
+        'projectedPoints': projected,
+        'points': actual,
+        'injured': getattr(player, 'injured', False),
+        'injuryStatus': getattr(player, 'injuryStatus', 'ACTIVE'),
+        'playerId': getattr(player, 'playerId', None),
+        'percentOwned': getattr(player, 'percent_owned', 0),
+        'percentStarted': getattr(player, 'percent_started', 0),
+    }
+
+def get_free_agent_crawl(espn_s2, swid, league_id, team_id, year):
+    """Reuse a running or recently finished crawl for this league, else build the League and start one"""
+    key = (league_id, year, espn_s2, swid)
+    with free_agent_crawls_lock:
+        crawl = free_agent_crawls.get(key)
+        if crawl and crawl.fresh(FREE_AGENT_SCAN_TTL):
+            record_cache('free_agent_crawl', True)
+            return crawl, None
+    record_cache('free_agent_crawl', False)
+    
+    league, team, error = get_league_and_team(
+        espn_s2=espn_s2,
+        swid=swid,
+        league_id=league_id,
+        team_id=team_id,
+        year=year
+    )
+    if error:
+        return None, error
+    with free_agent_crawls_lock:
+        # Another request may have started a crawl while the League was built
+        crawl = free_agent_crawls.get(key)
+        if crawl and crawl.fresh(FREE_AGENT_SCAN_TTL):
+            return crawl, None
+        # Finished crawls past the reuse window hold a League through fetch_page; drop them
+        for stale_key in [k for k, c in free_agent_crawls.items() if not c.fresh(FREE_AGENT_SCAN_TTL)]:
+            del free_agent_crawls[stale_key]
+        week = league.current_week
+        crawl = FreeAgentCrawler(
+            fetch_page=lambda slot, offset, limit: fetch_free_agent_page(http_session, league, slot, offset, limit),
+            to_row=lambda entry: free_agent_row(Player(entry, year), week),
+            page_size=FREE_AGENT_PAGE_SIZE,
+            max_workers=FREE_AGENT_SCAN_WORKERS,
+            max_pages=FREE_AGENT_SCAN_MAX_PAGES,
+        ).start()
+        free_agent_crawls[key] = crawl
+        return crawl, None
+
+def stream_free_agent_crawl(crawl, fields, position=None):
+    """NDJSON stream of newly merged free agents while the crawl runs"""
+    def generate():
+        count = 0
+        for players, _, done in crawl.stream():
+            if position:
+                players = [p for p in players if p['position'] == position]
+            count += len(players)
+            line = {'players': [{f: p[f] for f in fields} for p in players], 'count': count, 'done': done}
+            if done and crawl.error:
+                line['error'] = str(crawl.error)
+            yield app.json.dumps(line) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/espn/live', methods=['GET'])
+def live_scoring():
+    try:
+        # Get credentials from request headers
+        espn_s2 = request.headers.get('X-ESPN-S2')
+        swid = request.headers.get('X-ESPN-SWID')
+        league_id_str = request.headers.get('X-ESPN-LEAGUE-ID')
+        team_id_str = request.headers.get('X-ESPN-TEAM-ID')
+        year_str = request.headers.get('X-ESPN-YEAR')
+        
+        # Validate required credentials
+        if not espn_s2 or not swid:
+            return jsonify({'error': 'Missing ESPN credentials (espn_s2 or swid)'}), 400
+        
+        if not league_id_str or not team_id_str or not year_str:
+            return jsonify({'error': 'Missing league/team/year information'}), 400
+        
+        # Normalize SWID format (espn-api expects curly brackets)
+        swid = normalize_swid(swid)
+        
+        try:
+            league_id = int(league_id_str)
+            team_id = int(team_id_str)
+            year = int(year_str)
+            since_str = request.args.get('since') or request.headers.get('Last-Event-ID')
+            since = int(since_str.rsplit(':', 1)[-1]) if since_str else None
+        except ValueError as e:
+            return jsonify({'error': f'Invalid league/team/year/since format: {str(e)}'}), 400
+        
+        epoch = request.args.get('epoch')
+        if since_str and ':' in since_str:
+            epoch = since_str.split(':', 1)[0]
+        # scope=league returns every team's players, default is the caller's team
+        scope_team = None if request.args.get('scope') == 'league' else team_id
+        
+        state, error = get_live_state(espn_s2, swid, league_id, team_id, year)
+        if error:
+            return jsonify({'error': error}), 404
+        
+        if request.args.get('stream') == 'sse' or 'text/event-stream' in request.headers.get('Accept', ''):
+            return stream_live_scoring(state, since, epoch, scope_team)
+        
+        with timed('live_refresh'):
+            state.refresh_if_stale(LIVE_REFRESH_INTERVAL)
+        with timed('json_encode'):
+            response = jsonify(state.delta(since, epoch, scope_team))
+        return response
+    
+    except UpstreamError as e:
+        return upstream_error_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def get_live_state(espn_s2, swid, league_id, team_id, year):
+    """Live state for a league, constructing the League only on first use"""
+    key = (league_id, year, espn_s2, swid)
+    with live_states_lock:
+        state = live_states.get(key)
+        now = time.monotonic()
+        for stale_key in [k for k, s in live_states.items() if now - s.last_access > LIVE_STATE_IDLE_TTL]:
+            del live_states[stale_key]
+    record_cache('live_state', state is not None)
+    if state:
+        return state, None
+    
+    league, team, error = get_league_and_team(
+        espn_s2=espn_s2,
+        swid=swid,
+        league_id=league_id,
+        team_id=team_id,
+        year=year
+    )
+    if error:
+        return None, error
+    with live_states_lock:
+        state = live_states.setdefault(key, LiveScoringState(league, league_max_age=LIVE_LEAGUE_MAX_AGE))
+    return state, None
+
+def stream_live_scoring(state, since, epoch, team_id):
+    """Server-sent events: one `delta` event per new version, comments as keepalives.
+
+    Each stream holds a worker thread, so at most LIVE_SSE_MAX_STREAMS run at
+    once; past that the client gets a single delta and a `retry:` hint, and
+    EventSource reconnects (with Last-Event-ID) after one refresh interval.
+    """
+    def generate():
+        cursor, cursor_epoch = since, epoch
+        admitted = live_sse_slots.acquire(blocking=False)
+        if not admitted:
+            yield f"retry: {int(LIVE_REFRESH_INTERVAL * 1000)}\n\n"
+        deadline = time.monotonic() + (LIVE_SSE_MAX_SECONDS if admitted else 0)
+        try:
+            while True:
+                try:
+                    state.refresh_if_stale(LIVE_REFRESH_INTERVAL)
+                except UpstreamError as e:
+                    event = 'throttled' if isinstance(e, UpstreamThrottled) else 'unavailable'
+                    yield f"event: {event}\ndata: {app.json.dumps({'error': str(e)})}\n\n"
+                delta = state.delta(cursor, cursor_epoch, team_id)
+                if delta['full'] or delta['players'] or delta['removed']:
+                    yield f"id: {delta['epoch']}:{delta['version']}\nevent: delta\ndata: {app.json.dumps(delta)}\n\n"
+                else:
+                    yield ": keepalive\n\n"
+                cursor, cursor_epoch = delta['version'], delta['epoch']
+                if time.monotonic() >= deadline:
+                    return
+                state.wait_for_change(cursor, min(LIVE_REFRESH_INTERVAL, max(0.0, deadline - time.monotonic())))
+        finally:
+            if admitted:
+                live_sse_slots.release()
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/espn/ai-start-sit', methods=['POST'])
 def ai_start_sit_advice():
     try:
-        import requests
-        
         data = request.get_json()
         player_a = data.get('playerA')
         player_b = data.get('playerB')
@@ -453,7 +817,7 @@ Be concise and direct."""
         if not gemini_api_key:
             return jsonify({'error': 'Gemini API key not configured'}), 500
         
-        gemini_url = f'https://generativelanguage.googleapis.com/v1/models/gemini-2.0-flash:generateContent?key={gemini_api_key}'
+        gemini_url = f'{GEMINI_API_BASE}/v1/models/gemini-2.0-flash:generateContent?key={gemini_api_key}'
         
         gemini_request = {
             'contents': [{
@@ -466,8 +830,21 @@ Be concise and direct."""
             }
         }
         
-        response = requests.post(gemini_url, json=gemini_request, timeout=30)
-        
+        with upstream_call(gemini_breaker, gemini_url):
+            try:
+                with timed('gemini'):
+                    response = http_session.post(gemini_url, json=gemini_request, timeout=30)
+            except requests.RequestException as e:
+                raise UpstreamUnavailable(f'Gemini unreachable: {e}')
+            
+            if response.status_code in (429, 503):
+                raise UpstreamThrottled(
+                    f'Gemini is throttling requests (HTTP {response.status_code})',
+                    retry_after=response.headers.get('Retry-After'),
+                )
+            if response.status_code >= 500:
+                raise UpstreamUnavailable(f'Gemini API returned status {response.status_code}')
+
         if response.status_code != 200:
             return jsonify({'error': f'Gemini API error: {response.text}'}), 500
         
@@ -510,6 +887,71 @@ Be concise and direct."""
             'playerBName': player_b['name']
         })
     
+    except UpstreamError as e:
+        return upstream_error_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/players/search', methods=['GET'])
+def search_players():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Missing search query (q)'}), 400
+        if len(normalize_name(query).replace(' ', '')) < MIN_QUERY_LENGTH:
+            return jsonify({'error': f'Search query must be at least {MIN_QUERY_LENGTH} letters'}), 400
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 10)), 50))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid limit: {str(e)}'}), 400
+        position = request.args.get('position') or None
+        
+        index = player_index.get(timeout=NFLVERSE_LOAD_WAIT)
+        if not index.sources:
+            reason = player_index.unavailable_reason(f'no roster parquet files in {NFLVERSE_CACHE_DIR}')
+            return jsonify({'error': f'Player index unavailable: {reason}'}), 503, {'Retry-After': '10'}
+        
+        with timed('search'):
+            results = index.search(query, limit=limit, position=position)
+        
+        return jsonify({
+            'query': query,
+            'results': results,
+            'count': len(results)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/players/<player_id>/aggregates', methods=['GET'])
+def get_player_aggregates(player_id):
+    try:
+        season = request.args.get('season')
+        if season is not None:
+            try:
+                season = int(season)
+            except ValueError:
+                return jsonify({'error': f'Invalid season: {season}'}), 400
+        
+        aggregates = player_aggregates.get(timeout=NFLVERSE_LOAD_WAIT)
+        if not aggregates.sources:
+            reason = player_aggregates.unavailable_reason(f'no weekly stats parquet files in {NFLVERSE_CACHE_DIR}')
+            return jsonify({'error': f'Player aggregates unavailable: {reason}'}), 503, {'Retry-After': '10'}
+        
+        if season is None:
+            seasons = aggregates.seasons_for(player_id)
+        else:
+            record = aggregates.get(player_id, season)
+            seasons = [record] if record else []
+        if not seasons:
+            return jsonify({'error': f'No aggregates for player {player_id}' + (f' in {season}' if season else '')}), 404
+        
+        return jsonify({
+            'playerId': player_id,
+            'seasons': seasons
+        })
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,95 @@
+"""Record real ESPN responses into a fixtures directory for the stub server.
+
+Uses the same environment variables as the service (ESPN_LEAGUE_ID,
+ESPN_YEAR, ESPN_S2, ESPN_SWID). Every ESPN fixture, including the current
+week's box scores (mMatchupScore), is recorded from the same league so player
+ids line up. The Gemini response is only recorded with --gemini, which needs
+GEMINI_API_KEY and spends a real generateContent call; without it the stub
+serves its canned response.
+
+    python -m bench.record --out bench/fixtures/my-league
+    GEMINI_API_KEY=... python -m bench.record --out bench/fixtures/my-league --gemini
+"""
+import argparse
+import json
+import os
+
+import requests
+
+from espn_api.requests.constant import FANTASY_BASE_ENDPOINT
+
+
+def record_gemini(league):
+    """One real start/sit answer for two players on the recorded league's first roster"""
+    entries = league['teams'][0]['roster']['entries'][:2]
+    player_a, player_b = (e['playerPoolEntry']['player']['fullName'] for e in entries)
+    prompt = (f"You are an expert fantasy football advisor. Recommend which player to START this week.\n"
+              f"Player A: {player_a}\nPlayer B: {player_b}\n"
+              "Provide your recommendation in EXACTLY this format:\n"
+              "RECOMMENDATION: [A or B]\nCONFIDENCE: [number from 0-100]\nREASONING: [2-3 sentences]")
+    base = os.getenv('GEMINI_API_BASE', 'https://generativelanguage.googleapis.com')
+    resp = requests.post(
+        f"{base}/v1/models/gemini-2.0-flash:generateContent?key={os.environ['GEMINI_API_KEY']}",
+        json={'contents': [{'parts': [{'text': prompt}]}]},
+        timeout=60,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--free-agents', type=int, default=1500, help='free-agent pool size to record')
+    parser.add_argument('--gemini', action='store_true',
+                        help='also record a Gemini start/sit answer (needs GEMINI_API_KEY)')
+    args = parser.parse_args()
+    if args.gemini and not os.getenv('GEMINI_API_KEY'):
+        parser.error('--gemini needs GEMINI_API_KEY')
+
+    league_id = os.environ['ESPN_LEAGUE_ID']
+    year = os.getenv('ESPN_YEAR', '2025')
+    cookies = {'espn_s2': os.environ['ESPN_S2'], 'SWID': os.environ['ESPN_SWID']}
+    season = f'{FANTASY_BASE_ENDPOINT}ffl/seasons/{year}'
+    league_url = f'{season}/segments/0/leagues/{league_id}'
+
+    def fetch(url, view, headers=None, **params):
+        resp = requests.get(url, params={'view': view, **params}, cookies=cookies, headers=headers,
+                            timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    free_agent_filter = {'players': {
+        'filterStatus': {'value': ['FREEAGENT', 'WAIVERS']},
+        'limit': args.free_agents,
+        'sortPercOwned': {'sortPriority': 1, 'sortAsc': False},
+    }}
+    league = fetch(league_url, ['mTeam', 'mRoster', 'mMatchup', 'mSettings', 'mStandings'])
+    # The same request League.box_scores() makes for the current week
+    matchup_filter = {'schedule': {'filterMatchupPeriodIds': {
+        'value': [league['status']['currentMatchupPeriod']]}}}
+    fixtures = {
+        'league': league,
+        'draft': fetch(league_url, 'mDraftDetail'),
+        'players': fetch(f'{season}/players', 'players_wl',
+                         {'x-fantasy-filter': json.dumps({'filterActive': {'value': True}})}),
+        'pro_schedule': fetch(season, 'proTeamSchedules_wl'),
+        'free_agents': fetch(league_url, 'kona_player_info',
+                             {'x-fantasy-filter': json.dumps(free_agent_filter)}),
+        'positional_ratings': fetch(league_url, 'mPositionalRatings'),
+        'box_scores': fetch(league_url, ['mMatchupScore', 'mScoreboard'],
+                            {'x-fantasy-filter': json.dumps(matchup_filter)},
+                            scoringPeriodId=league['scoringPeriodId']),
+    }
+    if args.gemini:
+        fixtures['gemini'] = record_gemini(league)
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, data in fixtures.items():
+        with open(os.path.join(args.out, f'{name}.json'), 'w') as f:
+            json.dump(data, f)
+    print(f"Recorded {len(fixtures)} fixtures to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Load-test the Flask service against local ESPN/Gemini stubs.
+
+Starts the stub servers and the service (gunicorn when available, otherwise
+the Flask dev server), drives each endpoint at the requested concurrency
+levels and reports throughput and p50/p95/p99 latency. With --baseline the
+run fails when any p95 regresses by more than --max-regression.
+
+    python -m bench.run --concurrency 1,8,32 --requests 200
+    python -m bench.run --json-out bench_results.json
+    python -m bench.run --baseline bench_results.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESPN_HEADERS = {
+    'X-ESPN-S2': 'bench-espn-s2',
+    'X-ESPN-SWID': '{BENCH-SWID}',
+    'X-ESPN-LEAGUE-ID': '1',
+    'X-ESPN-TEAM-ID': '1',
+    'X-ESPN-YEAR': '2025',
+}
+START_SIT_BODY = {
+    'playerA': {'name': 'Player A', 'position': 'RB', 'proTeam': 'KC', 'projectedPoints': 14.2,
+                'points': 12.8, 'lineupSlot': 'RB', 'injuryStatus': 'ACTIVE'},
+    'playerB': {'name': 'Player B', 'position': 'RB', 'proTeam': 'SF', 'projectedPoints': 11.5,
+                'points': 13.1, 'lineupSlot': 'BE', 'injuryStatus': 'QUESTIONABLE'},
+}
+ENDPOINTS = {
+    'roster': ('GET', '/api/espn/roster', None),
+    'optimize-lineup': ('GET', '/api/espn/optimize-lineup', None),
+    'free-agents': ('GET', '/api/espn/free-agents?size=200', None),
+    'ai-start-sit': ('POST', '/api/espn/ai-start-sit', START_SIT_BODY),
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def drive(base_url, endpoint, concurrency, total):
+    """Issue `total` requests with `concurrency` workers and summarise latencies"""
+    method, path, body = ENDPOINTS[endpoint]
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    remaining = [total]
+    local = threading.local()
+
+    def worker():
+        nonlocal errors
+        session = getattr(local, 'session', None) or requests.Session()
+        local.session = session
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                resp = session.request(method, base_url + path, headers=ESPN_HEADERS, json=body, timeout=60)
+                ok = resp.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors += 0 if ok else 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_processes(args):
+    stubs = subprocess.Popen(
+        [sys.executable, '-m', 'bench.stubs', '--espn-port', str(args.espn_port),
+         '--gemini-port', str(args.gemini_port), '--latency-ms', str(args.latency_ms),
+         '--jitter-ms', str(args.jitter_ms), '--gemini-latency-ms', str(args.gemini_latency_ms)]
+        + (['--fixtures', args.fixtures] if args.fixtures else []),
+        cwd=SERVICE_DIR, stdout=subprocess.DEVNULL)
+
+    env = dict(os.environ,
+               PORT=str(args.port),
+               ESPN_API_BASE=f'http://127.0.0.1:{args.espn_port}/apis/v3/games',
+               GEMINI_API_BASE=f'http://127.0.0.1:{args.gemini_port}',
+               GEMINI_API_KEY='bench',
+               OUTBOUND_RATE_LIMITS=args.rate_limits)
+    if shutil.which('gunicorn') and not args.dev_server:
+        cmd = ['gunicorn', 'app:app', '-b', f'127.0.0.1:{args.port}',
+               '-w', str(args.workers), '--threads', str(args.threads)]
+    else:
+        cmd = [sys.executable, 'app.py']
+    service = subprocess.Popen(cmd, cwd=SERVICE_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return stubs, service
+
+
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path) as f:
+        baseline = {(r['endpoint'], r['concurrency']): r for r in json.load(f)['results']}
+    failures = []
+    for r in results:
+        base = baseline.get((r['endpoint'], r['concurrency']))
+        if base and base['p95_ms'] and r['p95_ms'] > base['p95_ms'] * (1 + max_regression):
+            failures.append(f"{r['endpoint']} @ c={r['concurrency']}: p95 "
+                            f"{base['p95_ms']}ms -> {r['p95_ms']}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint per level')
+    parser.add_argument('--fixtures', help='directory of recorded fixtures (default: synthetic)')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='ESPN stub latency')
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--gemini-latency-ms', type=float, default=400.0)
+    parser.add_argument('--port', type=int, default=5090)
+    parser.add_argument('--espn-port', type=int, default=9001)
+    parser.add_argument('--gemini-port', type=int, default=9002)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--dev-server', action='store_true', help='use the Flask dev server')
+    parser.add_argument('--rate-limits', default='127.0.0.1=100000:100000',
+                        help='OUTBOUND_RATE_LIMITS for the service under test')
+    parser.add_argument('--json-out')
+    parser.add_argument('--baseline')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    args = parser.parse_args()
+
+    stubs, service = start_processes(args)
+    base_url = f'http://127.0.0.1:{args.port}'
+    results = []
+    try:
+        wait_until_up(f'http://127.0.0.1:{args.espn_port}/')
+        wait_until_up(f'{base_url}/metrics')
+        print(f"{'endpoint':<18}{'conc':>6}{'reqs':>7}{'errs':>6}{'rps':>10}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for endpoint in args.endpoints.split(','):
+            for concurrency in (int(c) for c in args.concurrency.split(',')):
+                r = drive(base_url, endpoint, concurrency, args.requests)
+                results.append(r)
+                print(f"{endpoint:<18}{concurrency:>6}{r['requests']:>7}{r['errors']:>6}"
+                      f"{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+    finally:
+        service.terminate()
+        stubs.terminate()
+        service.wait()
+        stubs.wait()
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'args': vars(args),
+                       'results': results}, f, indent=2)
+    if args.baseline:
+        failures = compare(results, args.baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
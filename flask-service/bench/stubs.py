@@ -0,0 +1,325 @@
+"""Local stub servers that stand in for ESPN Fantasy and Gemini.
+
+The ESPN stub answers the handful of endpoints espn-api and the preflight
+GET hit, replaying JSON from a fixtures directory (see `python -m
+bench.record`) or, when none is given, from a deterministic synthetic league.
+The Gemini stub returns a canned generateContent response. Both add a
+configurable latency (mean + jitter) to every response.
+
+For failure testing the ESPN stub can answer every Nth request with a 429
+(JSON, Retry-After), a CDN-style 403 (HTML block page) or a 401 (JSON
+auth error, which must not be mistaken for throttling).
+
+    python -m bench.stubs --espn-port 9001 --gemini-port 9002 --latency-ms 80
+    python -m bench.stubs --throttle-status 403 --throttle-every 3
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+POSITIONS = [('QB', 0, [0, 7, 20, 21]), ('RB', 2, [2, 3, 23, 7, 20, 21]),
+             ('WR', 4, [3, 4, 5, 23, 7, 20, 21]), ('TE', 6, [5, 6, 23, 7, 20, 21]),
+             ('K', 17, [17, 20, 21]), ('D/ST', 16, [16, 20, 21])]
+ROSTER_SHAPE = [('QB', 0), ('RB', 2), ('RB', 2), ('WR', 4), ('WR', 4), ('TE', 6), ('RB', 23),
+                ('D/ST', 16), ('K', 17), ('QB', 20), ('RB', 20), ('RB', 20), ('WR', 20),
+                ('WR', 20), ('TE', 20), ('WR', 20)]
+INJURY_STATUSES = ['ACTIVE'] * 8 + ['QUESTIONABLE', 'OUT']
+# Recorded together from one league by bench.record; synthetic stand-ins would not share its player ids
+ESPN_FIXTURE_FILES = ('league', 'draft', 'players', 'pro_schedule', 'free_agents',
+                      'positional_ratings', 'box_scores')
+FIXTURE_FILES = ESPN_FIXTURE_FILES + ('gemini',)
+
+CDN_BLOCK_PAGE = b'<html><head><title>Access Denied</title></head><body>Access Denied</body></html>'
+FAILURE_STATUSES = (429, 403, 401)
+
+GEMINI_TEXT = ("RECOMMENDATION: A\nCONFIDENCE: 72\n"
+               "REASONING: Player A has the higher projection and a healthy status.")
+GEMINI_RESPONSE = {'candidates': [{'content': {'parts': [{'text': GEMINI_TEXT}]}}]}
+
+
+def _player(rng, pid, position, year, week):
+    name, default_pos, slots = next(p for p in POSITIONS if p[0] == position)
+    injury = rng.choice(INJURY_STATUSES)
+    stats = []
+    for period in range(1, week + 1):
+        actual = round(rng.uniform(0, 30), 2)
+        stats.append({'seasonId': year, 'statSplitTypeId': 1, 'scoringPeriodId': period,
+                      'statSourceId': 0, 'appliedTotal': actual, 'appliedAverage': actual,
+                      'stats': {'0': 1}, 'proTeamId': 0})
+        stats.append({'seasonId': year, 'statSplitTypeId': 1, 'scoringPeriodId': period,
+                      'statSourceId': 1, 'appliedTotal': round(rng.uniform(2, 25), 2),
+                      'appliedAverage': 0, 'stats': {}})
+    for source in (0, 1):
+        stats.append({'seasonId': year, 'statSplitTypeId': 0, 'scoringPeriodId': 0,
+                      'statSourceId': source, 'appliedTotal': round(rng.uniform(20, 250), 2),
+                      'appliedAverage': round(rng.uniform(2, 22), 2), 'stats': {}})
+    return {
+        'id': pid,
+        'fullName': f'{name} Player {pid}',
+        'proTeamId': rng.randint(1, 30),
+        'defaultPositionId': default_pos,
+        'eligibleSlots': slots,
+        'injuryStatus': injury,
+        'injured': injury != 'ACTIVE',
+        'ownership': {'percentOwned': round(rng.uniform(0, 100), 2),
+                      'percentStarted': round(rng.uniform(0, 100), 2)},
+        'stats': stats,
+    }
+
+
+def synthetic_fixtures(teams=12, free_agents=1200, year=2025, week=8, seed=7):
+    """Build a deterministic league with `teams` full rosters and a free-agent pool"""
+    rng = random.Random(seed)
+    pid = 1000
+    team_data, schedule, players = [], [], []
+    for team_id in range(1, teams + 1):
+        entries = []
+        for position, slot in ROSTER_SHAPE:
+            pid += 1
+            player = _player(rng, pid, position, year, week)
+            players.append(player)
+            entries.append({'playerId': pid, 'lineupSlotId': slot,
+                            'playerPoolEntry': {'id': pid, 'onTeamId': team_id, 'player': player}})
+        team_data.append({
+            'id': team_id, 'abbrev': f'T{team_id}', 'name': f'Team {team_id}', 'divisionId': 0,
+            'playoffSeed': team_id, 'owners': [],
+            'record': {'overall': {'wins': 0, 'losses': 0, 'ties': 0, 'pointsFor': 0,
+                                   'pointsAgainst': 0, 'streakLength': 0, 'streakType': 'WIN'}},
+            'roster': {'entries': entries},
+        })
+    for period in range(1, week + 1):
+        for home in range(1, teams + 1, 2):
+            schedule.append({'matchupPeriodId': period, 'winner': 'UNDECIDED',
+                             'home': {'teamId': home, 'totalPoints': 0},
+                             'away': {'teamId': home + 1, 'totalPoints': 0}})
+    league = {
+        'id': 1, 'seasonId': year, 'scoringPeriodId': week,
+        'status': {'currentMatchupPeriod': week, 'firstScoringPeriod': 1,
+                   'finalScoringPeriod': 17, 'latestScoringPeriod': week, 'previousSeasons': []},
+        'settings': {
+            'name': 'Benchmark League', 'size': teams,
+            'scheduleSettings': {'matchupPeriodCount': 14, 'matchupPeriods': {},
+                                 'playoffTeamCount': 4, 'playoffSeedingRule': 'TOTAL_POINTS_SCORED'},
+            'tradeSettings': {'vetoVotesRequired': 4},
+            'draftSettings': {'keeperCount': 0},
+            'scoringSettings': {'matchupTieRule': 'NONE', 'playoffMatchupTieRule': 'NONE',
+                                'scoringItems': []},
+            'acquisitionSettings': {'isUsingAcquisitionBudget': False},
+            'rosterSettings': {'lineupSlotCounts': {}},
+        },
+        'members': [], 'teams': team_data, 'schedule': schedule,
+    }
+    pool = []
+    for _ in range(free_agents):
+        pid += 1
+        position = rng.choice(POSITIONS)[0]
+        pool.append({'id': pid, 'onTeamId': 0, 'status': 'FREEAGENT',
+                     'player': _player(rng, pid, position, year, week)})
+        players.append(pool[-1]['player'])
+    pool.sort(key=lambda p: p['player']['ownership']['percentOwned'], reverse=True)
+    return {
+        'league': league,
+        'box_scores': box_scores(team_data, week),
+        'draft': {'draftDetail': {'drafted': False}},
+        'players': [{'id': p['id'], 'fullName': p['fullName']} for p in players],
+        'pro_schedule': {'settings': {'proTeams': []}},
+        'free_agents': {'players': pool},
+        'positional_ratings': {'positionAgainstOpponent': {'positionalRatings': {}}},
+        'gemini': GEMINI_RESPONSE,
+    }
+
+
+def box_scores(team_data, week):
+    """Current-week matchups with each team's lineup, as mMatchupScore returns them"""
+    schedule = []
+    for home, away in zip(team_data[::2], team_data[1::2]):
+        schedule.append({'matchupPeriodId': week, 'winner': 'UNDECIDED', **{
+            side: {'teamId': team['id'], 'totalPoints': 0,
+                   'rosterForCurrentScoringPeriod': {'entries': team['roster']['entries']}}
+            for side, team in (('home', home), ('away', away))}})
+    return {'schedule': schedule}
+
+
+def drift_live_points(fixture, week, rng, changes=5):
+    """Bump a few players' current-week points to simulate games in progress"""
+    entries = [e for m in fixture['schedule'] for side in ('home', 'away')
+               for e in m[side]['rosterForCurrentScoringPeriod']['entries']]
+    for entry in rng.sample(entries, min(changes, len(entries))):
+        for stat in entry['playerPoolEntry']['player']['stats']:
+            if stat['scoringPeriodId'] == week and stat['statSourceId'] == 0:
+                stat['appliedTotal'] = round(stat['appliedTotal'] + rng.choice((0.1, 1, 2, 6)), 2)
+
+
+def load_fixtures(path):
+    """Load a recorded fixtures directory.
+
+    Every ESPN fixture must be present: mixing in synthetic ones would pair the
+    recorded league with players it doesn't have. gemini.json is optional
+    (bench.record --gemini) and falls back to the canned response, which
+    names no players.
+    """
+    missing = [f'{name}.json' for name in ESPN_FIXTURE_FILES
+               if not os.path.exists(os.path.join(path, f'{name}.json'))]
+    if missing:
+        raise FileNotFoundError(f"{path} is missing {', '.join(missing)}; re-record it with "
+                                f"python -m bench.record")
+    fixtures = {'gemini': GEMINI_RESPONSE}
+    for name in FIXTURE_FILES:
+        file_path = os.path.join(path, f'{name}.json')
+        if os.path.exists(file_path):
+            with open(file_path) as f:
+                fixtures[name] = json.load(f)
+    if fixtures['gemini'] is GEMINI_RESPONSE:
+        print(f"{path} has no gemini.json; the Gemini stub serves its canned response")
+    return fixtures
+
+
+def filter_free_agents(pool, filter_header):
+    """Apply the x-fantasy-filter slot/limit/offset to the free-agent pool"""
+    try:
+        spec = json.loads(filter_header or '{}').get('players', {})
+    except ValueError:
+        spec = {}
+    slots = set(spec.get('filterSlotIds', {}).get('value') or [])
+    players = pool['players']
+    if slots:
+        players = [p for p in players if slots & set(p['player']['eligibleSlots'])]
+    offset = spec.get('offset', 0)
+    limit = spec.get('limit', len(players))
+    return {'players': players[offset:offset + limit]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    fixtures = {}
+    latency = 0.0
+    jitter = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class EspnStubHandler(StubHandler):
+    live_lock = threading.Lock()
+    live_rng = random.Random(11)
+    live_changes = 5
+    throttle_status = None
+    throttle_every = 1
+    request_count = 0
+    count_lock = threading.Lock()
+
+    def _inject_failure(self):
+        """Count every request; answer each `throttle_every`-th with `throttle_status` and return True"""
+        cls = type(self)
+        with cls.count_lock:
+            cls.request_count += 1
+            if not self.throttle_status or cls.request_count % self.throttle_every:
+                return False
+        if self.throttle_status == 429:
+            self._send(429, {'messages': ['Too Many Requests']}, headers={'Retry-After': '7'})
+        elif self.throttle_status == 403:
+            self._send(403, CDN_BLOCK_PAGE, content_type='text/html')
+        elif self.throttle_status >= 500:
+            self._send(self.throttle_status, {'messages': ['Service Unavailable']})
+        else:
+            self._send(self.throttle_status, {'messages': ['You are not authorized to view this League.'],
+                                              'details': [{'type': 'AUTH_LEAGUE_NOT_VISIBLE'}]})
+        return True
+
+    def do_GET(self):
+        self._delay()
+        if self._inject_failure():
+            return
+        url = urlparse(self.path)
+        views = parse_qs(url.query).get('view', [])
+        if url.path.endswith('/players'):
+            return self._send(200, self.fixtures['players'])
+        if '/leagues/' not in url.path:
+            return self._send(200, self.fixtures['pro_schedule'])
+        if 'kona_player_info' in views:
+            return self._send(200, filter_free_agents(
+                self.fixtures['free_agents'], self.headers.get('x-fantasy-filter')))
+        if 'mDraftDetail' in views:
+            return self._send(200, self.fixtures['draft'])
+        if 'mMatchupScore' in views:
+            with self.live_lock:
+                week = int(parse_qs(url.query).get('scoringPeriodId', ['0'])[0])
+                drift_live_points(self.fixtures['box_scores'], week, self.live_rng, self.live_changes)
+                return self._send(200, self.fixtures['box_scores'])
+        if 'mPositionalRatings' in views:
+            return self._send(200, self.fixtures['positional_ratings'])
+        if 'proTeamSchedules_wl' in views:
+            return self._send(200, self.fixtures['pro_schedule'])
+        return self._send(200, self.fixtures['league'])
+
+
+class GeminiStubHandler(StubHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self._delay()
+        return self._send(200, self.fixtures['gemini'])
+
+
+def serve(handler, port, fixtures, latency_ms, jitter_ms, **options):
+    """Start a stub server on a daemon thread and return it.
+
+    Extra keyword `options` override handler attributes (e.g. throttle_status).
+    The handler class is reachable as `server.RequestHandlerClass`.
+    """
+    handler_cls = type(handler.__name__, (handler,), {
+        'fixtures': fixtures, 'latency': latency_ms / 1000.0, 'jitter': jitter_ms / 1000.0,
+        **options})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--espn-port', type=int, default=9001)
+    parser.add_argument('--gemini-port', type=int, default=9002)
+    parser.add_argument('--fixtures', help='directory of recorded ESPN/Gemini JSON')
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--gemini-latency-ms', type=float, default=400.0)
+    parser.add_argument('--throttle-status', type=int, choices=FAILURE_STATUSES,
+                        help='answer ESPN requests with this status (403 is a CDN HTML page)')
+    parser.add_argument('--throttle-every', type=int, default=1,
+                        help='inject the failure on every Nth ESPN request')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures()
+    serve(EspnStubHandler, args.espn_port, fixtures, args.latency_ms, args.jitter_ms,
+          throttle_status=args.throttle_status, throttle_every=max(1, args.throttle_every))
+    serve(GeminiStubHandler, args.gemini_port, fixtures, args.gemini_latency_ms, args.jitter_ms)
+    print(f"ESPN stub on :{args.espn_port}, Gemini stub on :{args.gemini_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
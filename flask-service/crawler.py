@@ -0,0 +1,157 @@
+"""Parallel paginated crawl of a league's full free-agent pool.
+
+ESPN's kona_player_info view caps each response at the filter `limit`, so a
+full-pool scan is split into one lane per position slot, each walked in
+`page_size` pages via the filter `offset`. Pages run concurrently on a
+bounded thread pool through the shared session, rate limiter and circuit
+breaker; results are de-duplicated by playerId (flex-eligible players show up
+in several lanes) and merged as each page lands, so readers can stream the
+partial pool while the crawl is still running. A lane stops at a short page,
+at a page that brings no players the lane hasn't seen (ESPN ignoring or
+clamping `offset`), or after `max_pages` pages.
+"""
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from resilience import (
+    UpstreamRejected, UpstreamThrottled, UpstreamUnavailable, espn_breaker, is_throttle_response,
+    upstream_call,
+)
+
+# Position slot ids: QB, RB, WR, TE, D/ST, K
+POSITION_SLOTS = (0, 2, 4, 6, 16, 17)
+
+
+def fetch_free_agent_page(session, league, slot_id, offset, limit):
+    """Fetch one page of free agents for a position slot straight from ESPN"""
+    filters = {'players': {
+        'filterStatus': {'value': ['FREEAGENT', 'WAIVERS']},
+        'filterSlotIds': {'value': [slot_id]},
+        'limit': limit,
+        'offset': offset,
+        'sortPercOwned': {'sortPriority': 1, 'sortAsc': False},
+    }}
+    url = league.espn_request.LEAGUE_ENDPOINT
+    with upstream_call(espn_breaker, url):
+        try:
+            resp = session.get(
+                url,
+                params={'view': 'kona_player_info', 'scoringPeriodId': league.current_week},
+                headers={'x-fantasy-filter': json.dumps(filters)},
+                cookies=league.espn_request.cookies,
+                timeout=15,
+            )
+        except requests.RequestException as e:
+            raise UpstreamUnavailable(f"ESPN unreachable for free-agent page: {e}")
+        if is_throttle_response(resp):
+            raise UpstreamThrottled(f"ESPN throttled free-agent page (HTTP {resp.status_code})",
+                                    retry_after=resp.headers.get('Retry-After'))
+        if 400 <= resp.status_code < 500:
+            raise UpstreamRejected(f"ESPN API returned status {resp.status_code} for free-agent page")
+        if resp.status_code >= 500:
+            raise UpstreamUnavailable(f"ESPN API returned status {resp.status_code} for free-agent page")
+        if resp.status_code != 200:
+            raise Exception(f"ESPN API returned status {resp.status_code} for free-agent page")
+    return resp.json().get('players', [])
+
+class FreeAgentCrawler:
+    """Crawls every position lane page by page and merges the results"""
+    def __init__(self, fetch_page, to_row, page_size=100, max_workers=4, slots=POSITION_SLOTS,
+                 max_pages=50):
+        self.fetch_page = fetch_page
+        self.to_row = to_row
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.slots = slots
+        self.max_pages = max_pages
+        self.lane_seen = {slot: set() for slot in slots}
+        self.players = {}
+        self.order = []
+        self.pages = 0
+        self.done = False
+        self.error = None
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.cond = threading.Condition()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                pending = {pool.submit(self._crawl_page, slot, 0): (slot, 0) for slot in self.slots}
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        slot, offset = pending.pop(future)
+                        count, new_in_lane = future.result()
+                        next_offset = offset + self.page_size
+                        if count < self.page_size or not new_in_lane:
+                            continue
+                        if next_offset >= self.page_size * self.max_pages:
+                            print(f"Free-agent crawl: slot {slot} hit the {self.max_pages}-page cap")
+                            continue
+                        pending[pool.submit(self._crawl_page, slot, next_offset)] = (slot, next_offset)
+        except Exception as e:
+            print(f"Free-agent crawl failed after {self.pages} pages: {e}")
+            self.error = e
+        finally:
+            with self.cond:
+                self.done = True
+                self.finished_at = time.monotonic()
+                self.cond.notify_all()
+
+    def _crawl_page(self, slot, offset):
+        entries = self.fetch_page(slot, offset, self.page_size)
+        rows = [self.to_row(entry) for entry in entries]
+        with self.cond:
+            seen = self.lane_seen[slot]
+            new_in_lane = 0
+            for row in rows:
+                if row['playerId'] not in seen:
+                    seen.add(row['playerId'])
+                    new_in_lane += 1
+                if row['playerId'] not in self.players:
+                    self.players[row['playerId']] = row
+                    self.order.append(row['playerId'])
+            self.pages += 1
+            self.cond.notify_all()
+        return len(entries), new_in_lane
+
+    def snapshot(self):
+        """Players merged so far, in arrival order"""
+        with self.cond:
+            return [self.players[pid] for pid in self.order]
+
+    def wait(self, timeout=None):
+        """Block until the crawl finishes; re-raise its error if it failed"""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.done, timeout):
+                raise TimeoutError(f"Free-agent crawl still running after {timeout:.0f}s")
+        if self.error:
+            raise self.error
+
+    def stream(self, poll=15.0):
+        """Yield (new_players, total, done) as pages are merged"""
+        sent = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.done or len(self.order) > sent, poll)
+                new = [self.players[pid] for pid in self.order[sent:]]
+                sent = len(self.order)
+                done = self.done
+            yield new, sent, done
+            if done:
+                return
+
+    def fresh(self, ttl):
+        """Running crawls and ones that finished cleanly within `ttl` seconds can be reused"""
+        if not self.done:
+            return True
+        return self.error is None and time.monotonic() - self.finished_at < ttl
@@ -0,0 +1,14 @@
+"""Gunicorn settings for the Flask service (`gunicorn app:app -c gunicorn.conf.py`).
+
+/api/espn/live?stream=sse holds its connection for up to LIVE_SSE_MAX_SECONDS,
+so the service runs threaded workers: a stream occupies one thread instead of
+the whole worker, other requests keep being served, and the worker's
+heartbeat to the arbiter is not blocked by long responses. Keep
+LIVE_SSE_MAX_SECONDS below `timeout` and LIVE_SSE_MAX_STREAMS below `threads`.
+"""
+import os
+
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
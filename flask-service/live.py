@@ -0,0 +1,164 @@
+"""Versioned live scoring state built from ESPN box scores.
+
+Each league keeps one LiveScoringState holding the League object (built
+once), the latest per-player scoring rows and a bounded changelog of which
+players changed in each version. Pollers send `since=<version>` and get only
+the rows that changed after it, so bandwidth and server work scale with the
+number of changes instead of roster size. Refreshes are single-flight: all
+pollers of a league share one box-score fetch per refresh interval.
+
+The League's status (current week and matchup period) is re-read every
+`league_max_age` seconds, since box_scores() always targets the week the
+League last saw. When the week rolls over the state starts a new epoch, so
+clients that send it get a full snapshot of the new matchup.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+from resilience import (
+    UpstreamThrottled, UpstreamUnavailable, espn_breaker, is_outage_error, is_throttle_error,
+    upstream_call,
+)
+
+TRACKED_FIELDS = ('points', 'projectedPoints', 'injuryStatus', 'injured', 'lineupSlot')
+
+# box_scores() issues the matchup, pro-schedule and positional-ratings GETs
+BOX_SCORE_REQUEST_COST = 3
+# League.refresh() re-reads the league (status, settings, teams) and the pro schedule
+LEAGUE_REFRESH_COST = 2
+
+
+def box_player_row(player, team_id):
+    return {
+        'playerId': player.playerId,
+        'name': player.name,
+        'position': player.position,
+        'proTeam': player.proTeam,
+        'teamId': team_id,
+        'lineupSlot': player.slot_position,
+        'points': player.points,
+        'projectedPoints': player.projected_points,
+        'injuryStatus': player.injuryStatus,
+        'injured': player.injured,
+    }
+
+
+class LiveScoringState:
+    """Latest scoring rows for one league plus a changelog of versions"""
+    def __init__(self, league, history=256, league_max_age=900.0):
+        self.league = league
+        self.league_max_age = league_max_age
+        self.week = (league.current_week, league.currentMatchupPeriod)
+        self.league_refreshed_at = time.monotonic()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.players = {}
+        self.changelog = deque(maxlen=history)
+        self.refreshed_at = 0.0
+        self.last_access = time.monotonic()
+        self.refresh_lock = threading.Lock()
+        self.cond = threading.Condition()
+
+    def refresh_league(self):
+        """Re-read the league status; start a new epoch if the week rolled over"""
+        url = self.league.espn_request.LEAGUE_ENDPOINT
+        with upstream_call(espn_breaker, url, tokens=LEAGUE_REFRESH_COST):
+            try:
+                self.league.refresh()
+            except Exception as e:
+                if is_throttle_error(e):
+                    raise UpstreamThrottled(f"ESPN throttled league refresh: {e}")
+                if is_outage_error(e):
+                    raise UpstreamUnavailable(f"ESPN unavailable for league refresh: {e}")
+                raise
+        self.league_refreshed_at = time.monotonic()
+        week = (self.league.current_week, self.league.currentMatchupPeriod)
+        if week != self.week:
+            print(f"Live scoring: league {self.league.league_id} moved to week {week[0]}")
+            with self.cond:
+                self.week = week
+                self.epoch = uuid.uuid4().hex[:8]
+
+    def fetch_rows(self):
+        url = self.league.espn_request.LEAGUE_ENDPOINT
+        with upstream_call(espn_breaker, url, tokens=BOX_SCORE_REQUEST_COST):
+            try:
+                boxes = self.league.box_scores()
+            except Exception as e:
+                if is_throttle_error(e):
+                    raise UpstreamThrottled(f"ESPN throttled box scores: {e}")
+                if is_outage_error(e):
+                    raise UpstreamUnavailable(f"ESPN unavailable for box scores: {e}")
+                raise
+        rows = {}
+        for box in boxes:
+            for side, lineup in ((box.home_team, box.home_lineup), (box.away_team, box.away_lineup)):
+                team_id = getattr(side, 'team_id', side)
+                for player in lineup:
+                    rows[player.playerId] = box_player_row(player, team_id)
+        return rows
+
+    def refresh_if_stale(self, interval):
+        """Refresh from ESPN when older than `interval`; concurrent callers don't wait"""
+        self.last_access = time.monotonic()
+        if time.monotonic() - self.refreshed_at < interval:
+            return
+        blocking = self.version == 0
+        if not self.refresh_lock.acquire(blocking=blocking):
+            return
+        try:
+            if time.monotonic() - self.refreshed_at >= interval:
+                if time.monotonic() - self.league_refreshed_at >= self.league_max_age:
+                    self.refresh_league()
+                self.apply(self.fetch_rows())
+                self.refreshed_at = time.monotonic()
+        finally:
+            self.refresh_lock.release()
+
+    def apply(self, rows):
+        """Diff a fresh snapshot against current state and record a new version"""
+        with self.cond:
+            changed = [pid for pid, row in rows.items()
+                       if pid not in self.players
+                       or any(self.players[pid][f] != row[f] for f in TRACKED_FIELDS)]
+            removed = [pid for pid in self.players if pid not in rows]
+            if not changed and not removed and self.version:
+                return
+            self.version += 1
+            self.players = rows
+            self.changelog.append((self.version, set(changed) | set(removed)))
+            self.cond.notify_all()
+
+    def delta(self, since, epoch=None, team_id=None):
+        """Rows changed after `since`, or a full snapshot when the client can't be caught up"""
+        with self.cond:
+            oldest = self.changelog[0][0] if self.changelog else 1
+            full = (since is None or (epoch is not None and epoch != self.epoch)
+                    or since > self.version or since < oldest - 1)
+            if full:
+                pids = set(self.players)
+            else:
+                pids = set()
+                for version, changed in reversed(self.changelog):
+                    if version <= since:
+                        break
+                    pids |= changed
+            players = [self.players[pid] for pid in pids if pid in self.players]
+            removed = [] if full else [pid for pid in pids if pid not in self.players]
+            version = self.version
+        if team_id is not None:
+            players = [p for p in players if p['teamId'] == team_id]
+        return {
+            'epoch': self.epoch,
+            'version': version,
+            'full': full,
+            'players': players,
+            'removed': removed,
+        }
+
+    def wait_for_change(self, since, timeout):
+        """Block until the version moves past `since` or `timeout` elapses"""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.version > since, timeout)
@@ -0,0 +1,137 @@
+"""Low-overhead request instrumentation.
+
+Phases are timed with perf_counter into per-request lists (exposed as a
+Server-Timing header) and into in-process Prometheus histograms/counters
+rendered by the /metrics endpoint. No external client library is needed.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for label_values, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    labels = _format_labels(self.label_names, label_values, ('le', le))
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f'{self.name}_sum{labels} {total}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+request_duration = Histogram(
+    'flask_request_duration_seconds', 'Total request latency', labels=('endpoint', 'status'))
+phase_duration = Histogram(
+    'flask_phase_duration_seconds', 'Latency of individual request phases', labels=('endpoint', 'phase'))
+cache_events = Counter(
+    'flask_cache_events_total', 'Cache lookups by cache and result', labels=('cache', 'result'))
+
+REGISTRY = [request_duration, phase_duration, cache_events]
+
+
+@contextmanager
+def timed(phase):
+    """Time a block as a named phase of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if has_request_context():
+            g.setdefault('phases', []).append((phase, elapsed))
+            endpoint = g.get('metrics_endpoint', 'none')
+        else:
+            endpoint = 'none'
+        phase_duration.observe(elapsed, endpoint, phase)
+
+
+def record_cache(cache, hit):
+    cache_events.inc(cache, 'hit' if hit else 'miss')
+
+
+def init_app(app):
+    """Register timing hooks and the /metrics endpoint on a Flask app"""
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or 'unknown'
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        request_duration.observe(total, g.get('metrics_endpoint', 'none'), str(response.status_code))
+        timings = [f'{phase};dur={elapsed * 1000:.1f}' for phase, elapsed in g.get('phases', [])]
+        timings.append(f'total;dur={total * 1000:.1f}')
+        response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        lines = []
+        for metric in REGISTRY:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4'}
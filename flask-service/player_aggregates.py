@@ -0,0 +1,226 @@
+"""Per-player season and rolling-window aggregates precomputed from nflverse.
+
+Historical endpoints shouldn't rescan player_stats_weekly_*.parquet per
+request, so this module materializes one compact record per (player, season)
+at startup: games, fantasy points in standard / half-PPR / PPR, target and
+carry share of the team's volume in the weeks the player appeared, and
+last-3 / last-5 week rolling windows. NGS efficiency (ngs_*.parquet) is kept
+in a separate per-season table and merged on lookup, so lookups by gsis id
+are plain dict hits.
+
+Only regular-season weeks are aggregated. Each weekly file covers one season
+and is recomputed only when its mtime/size changes; the NGS files span every
+season, so a change to any of them rebuilds just the (small) NGS table.
+refreshed() builds a new table that shares the unchanged per-season tables
+and is swapped in by refresher.BackgroundRefresher, so lookups take no lock.
+"""
+import glob
+import os
+import re
+from collections import defaultdict
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional
+    pq = None
+
+WEEKLY_PATTERN = 'player_stats_weekly_*.parquet'
+WEEKLY_COLUMNS = ['player_id', 'player_display_name', 'position', 'team', 'season', 'week',
+                  'season_type', 'targets', 'receptions', 'carries', 'receiving_yards',
+                  'rushing_yards', 'passing_yards', 'passing_tds', 'rushing_tds', 'receiving_tds',
+                  'fantasy_points', 'fantasy_points_ppr']
+ROLLING_WINDOWS = (3, 5)
+
+# ngs file -> (volume column used as the weight, {source column: output key})
+NGS_SOURCES = {
+    'ngs_receiving.parquet': ('targets', {
+        'avg_separation': 'avgSeparation',
+        'avg_cushion': 'avgCushion',
+        'avg_intended_air_yards': 'avgIntendedAirYards',
+        'catch_percentage': 'catchPercentage',
+        'avg_yac_above_expectation': 'avgYacAboveExpectation',
+    }),
+    'ngs_rushing.parquet': ('rush_attempts', {
+        'efficiency': 'rushEfficiency',
+        'avg_time_to_los': 'avgTimeToLos',
+        'rush_yards_over_expected_per_att': 'rushYardsOverExpectedPerAtt',
+        'rush_pct_over_expected': 'rushPctOverExpected',
+    }),
+    'ngs_passing.parquet': ('attempts', {
+        'avg_time_to_throw': 'avgTimeToThrow',
+        'aggressiveness': 'aggressiveness',
+        'avg_air_yards_differential': 'avgAirYardsDifferential',
+        'completion_percentage_above_expectation': 'completionPctAboveExpectation',
+        'passer_rating': 'passerRating',
+    }),
+}
+
+
+def _share(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _points(weeks):
+    """Standard / half-PPR / PPR totals and per-game averages for a list of week rows"""
+    standard = sum(w['fantasy_points'] or 0.0 for w in weeks)
+    ppr = sum(w['fantasy_points_ppr'] or 0.0 for w in weeks)
+    half = (standard + ppr) / 2
+    games = len(weeks) or 1
+    return {
+        'standard': round(standard, 2),
+        'halfPpr': round(half, 2),
+        'ppr': round(ppr, 2),
+        'standardPerGame': round(standard / games, 2),
+        'halfPprPerGame': round(half / games, 2),
+        'pprPerGame': round(ppr / games, 2),
+    }
+
+
+def _usage(weeks, team_volume):
+    targets = sum(w['targets'] or 0 for w in weeks)
+    carries = sum(w['carries'] or 0 for w in weeks)
+    team_targets = sum(team_volume[(w['team'], w['week'])][0] for w in weeks)
+    team_carries = sum(team_volume[(w['team'], w['week'])][1] for w in weeks)
+    return {
+        'targets': targets,
+        'carries': carries,
+        'targetShare': _share(targets, team_targets),
+        'carryShare': _share(carries, team_carries),
+    }
+
+
+def aggregate_season(rows):
+    """Fold one season's weekly rows into {player_id: record}"""
+    weeks_by_player = defaultdict(list)
+    team_volume = defaultdict(lambda: [0, 0])
+    for row in rows:
+        if row['season_type'] != 'REG' or not row['player_id']:
+            continue
+        weeks_by_player[row['player_id']].append(row)
+        volume = team_volume[(row['team'], row['week'])]
+        volume[0] += row['targets'] or 0
+        volume[1] += row['carries'] or 0
+
+    table = {}
+    for player_id, weeks in weeks_by_player.items():
+        weeks.sort(key=lambda w: w['week'])
+        latest = weeks[-1]
+        record = {
+            'playerId': player_id,
+            'name': latest['player_display_name'],
+            'position': latest['position'],
+            'team': latest['team'],
+            'season': latest['season'],
+            'games': len(weeks),
+            'lastWeek': latest['week'],
+            'fantasyPoints': _points(weeks),
+            'receptions': sum(w['receptions'] or 0 for w in weeks),
+            'passingYards': sum(w['passing_yards'] or 0 for w in weeks),
+            'rushingYards': sum(w['rushing_yards'] or 0 for w in weeks),
+            'receivingYards': sum(w['receiving_yards'] or 0 for w in weeks),
+            'touchdowns': sum((w['passing_tds'] or 0) + (w['rushing_tds'] or 0)
+                              + (w['receiving_tds'] or 0) for w in weeks),
+            'rolling': {},
+        }
+        record.update(_usage(weeks, team_volume))
+        for window in ROLLING_WINDOWS:
+            recent = weeks[-window:]
+            record['rolling'][f'last{window}'] = dict(
+                _usage(recent, team_volume), games=len(recent), fantasyPoints=_points(recent))
+        table[player_id] = record
+    return table
+
+
+def aggregate_ngs(path, weight_column, metrics):
+    """Volume-weighted season means of NGS metrics as {season: {gsis_id: {...}}}"""
+    columns = ['season', 'season_type', 'week', 'player_gsis_id', weight_column, *metrics]
+    sums = defaultdict(lambda: defaultdict(float))
+    for row in pq.read_table(path, columns=columns).to_pylist():
+        # week 0 rows are NGS's own season summaries for qualified players only
+        if row['season_type'] != 'REG' or not row['week'] or not row['player_gsis_id']:
+            continue
+        weight = row[weight_column] or 0
+        if not weight:
+            continue
+        acc = sums[(row['season'], row['player_gsis_id'])]
+        for column in metrics:
+            if row[column] is not None:
+                acc[column] += row[column] * weight
+                acc[f'{column}__w'] += weight
+
+    table = defaultdict(dict)
+    for (season, gsis_id), acc in sums.items():
+        table[season][gsis_id] = {key: round(acc[column] / acc[f'{column}__w'], 3)
+                                  for column, key in metrics.items() if acc[f'{column}__w']}
+    return table
+
+
+class PlayerAggregates:
+    """Per-player season aggregates keyed by season, then gsis id"""
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.sources = {}
+        self.seasons = {}
+        self.season_files = {}
+        self.ngs_sources = {}
+        self.ngs = {}
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+
+    def refreshed(self):
+        """This table if nothing changed, else a new one sharing every unchanged season"""
+        if pq is None:
+            raise RuntimeError('pyarrow is not installed')
+        weekly = {}
+        for path in glob.glob(os.path.join(self.data_dir, WEEKLY_PATTERN)):
+            match = re.search(r'(\d{4})\.parquet$', path)
+            if match:
+                weekly[path] = (int(match.group(1)), self._signature(path))
+        ngs = {name: self._signature(os.path.join(self.data_dir, name))
+               for name in NGS_SOURCES if os.path.exists(os.path.join(self.data_dir, name))}
+        if ({path: sig for path, (_, sig) in weekly.items()} == self.sources
+                and ngs == self.ngs_sources):
+            return self
+
+        table = PlayerAggregates(self.data_dir)
+        table.sources = {p: sig for p, sig in self.sources.items() if p in weekly}
+        table.season_files = {p: self.season_files[p] for p in table.sources}
+        table.seasons = {season: self.seasons[season] for season in table.season_files.values()}
+        for path, (season, signature) in sorted(weekly.items()):
+            if table.sources.get(path) == signature:
+                continue
+            rows = pq.read_table(path, columns=WEEKLY_COLUMNS).to_pylist()
+            table.seasons[season] = aggregate_season(rows)
+            table.season_files[path] = season
+            table.sources[path] = signature
+
+        table.ngs, table.ngs_sources = self.ngs, self.ngs_sources
+        if ngs != self.ngs_sources:
+            merged = defaultdict(lambda: defaultdict(dict))
+            for name in ngs:
+                weight_column, metrics = NGS_SOURCES[name]
+                path = os.path.join(self.data_dir, name)
+                for season, players in aggregate_ngs(path, weight_column, metrics).items():
+                    for gsis_id, values in players.items():
+                        merged[season][gsis_id].update(values)
+            table.ngs = {season: dict(players) for season, players in merged.items()}
+            table.ngs_sources = ngs
+        return table
+
+    def describe(self):
+        return (f"{sum(len(t) for t in self.seasons.values())} player-seasons "
+                f"from {len(self.sources)} files")
+
+    def get(self, player_id, season):
+        """One player's season record with NGS efficiency merged in, or None"""
+        record = self.seasons.get(season, {}).get(player_id)
+        if record is None:
+            return None
+        return dict(record, ngs=self.ngs.get(season, {}).get(player_id))
+
+    def seasons_for(self, player_id):
+        """Every season on record for a player, newest first"""
+        seasons = sorted((s for s, table in self.seasons.items() if player_id in table), reverse=True)
+        return [self.get(player_id, season) for season in seasons]
@@ -0,0 +1,194 @@
+"""Trigram fuzzy-search index over nflverse roster parquet files.
+
+Every player from roster_*.parquet / roster_weekly_*.parquet is indexed under
+a few normalized aliases (full name, first + last, football name + last).
+Normalization lowercases, strips accents and punctuation, drops suffixes
+(Jr., III, ...) and maps common nicknames to a canonical first name, so
+"Mike Pittman Jr" and "Michael Pittman" normalize alike. Queries are matched
+by trigram similarity: candidates come from the postings of the query's
+rarest trigrams, read up to MAX_POSTINGS_SCANNED (very common ones like "  j"
+or "on " would otherwise pull in a large share of the index), and each
+candidate gets a Dice score from its full trigram overlap with the query.
+Queries shorter than MIN_QUERY_LENGTH characters are not ranked.
+
+The index tracks each source file's mtime/size. refreshed() returns the
+index itself when nothing changed, a copy with new season files added, or a
+full rebuild if an indexed file changed or vanished; it never modifies an
+index that may be serving searches (see refresher.BackgroundRefresher).
+"""
+import glob
+import heapq
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional
+    pq = None
+
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+NICKNAMES = {
+    'mike': 'michael', 'mikey': 'michael', 'chris': 'christopher', 'matt': 'matthew',
+    'josh': 'joshua', 'nick': 'nicholas', 'will': 'william', 'bill': 'william',
+    'billy': 'william', 'rob': 'robert', 'bob': 'robert', 'bobby': 'robert',
+    'tony': 'anthony', 'dan': 'daniel', 'danny': 'daniel', 'dave': 'david',
+    'jim': 'james', 'jimmy': 'james', 'joe': 'joseph', 'joey': 'joseph',
+    'ken': 'kenneth', 'kenny': 'kenneth', 'tom': 'thomas', 'tommy': 'thomas',
+    'zach': 'zachary', 'zack': 'zachary', 'gabe': 'gabriel', 'cam': 'cameron',
+    'alex': 'alexander', 'ben': 'benjamin', 'sam': 'samuel', 'jon': 'jonathan',
+    'johnny': 'john', 'jake': 'jacob', 'drew': 'andrew', 'andy': 'andrew',
+    'greg': 'gregory', 'jeff': 'jeffrey', 'steve': 'steven', 'stephen': 'steven',
+    'pat': 'patrick', 'rich': 'richard', 'rick': 'richard', 'dick': 'richard',
+    'ed': 'edward', 'eddie': 'edward', 'ted': 'theodore', 'teddy': 'theodore',
+    'tim': 'timothy', 'nate': 'nathaniel', 'max': 'maxwell',
+}
+INDEX_COLUMNS = ['season', 'team', 'position', 'full_name', 'first_name', 'last_name',
+                 'football_name', 'gsis_id', 'espn_id', 'sleeper_id']
+# Aliases sharing fewer than this fraction of the query's trigrams are not scored
+MIN_OVERLAP = 0.3
+# Postings read per query to generate candidates; the query's most common
+# trigrams beyond this are only used to score candidates
+MAX_POSTINGS_SCANNED = 800
+MIN_QUERY_LENGTH = 3
+
+
+def normalize_name(name):
+    """Lowercase, strip accents/punctuation/suffixes and canonicalize nicknames"""
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode().lower()
+    name = re.sub(r"(?<=\b[a-z])\.(?=[a-z]\.)", '', name)  # "a.j." -> "aj."
+    name = re.sub(r"[.'`]", '', name)
+    tokens = [t for t in re.split(r'[^a-z0-9]+', name) if t and t not in SUFFIXES]
+    if tokens:
+        tokens[0] = NICKNAMES.get(tokens[0], tokens[0])
+    return ' '.join(tokens)
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerSearchIndex:
+    """In-memory trigram index of nflverse players keyed by gsis_id"""
+    def __init__(self, data_dir, patterns=('roster_*.parquet',)):
+        self.data_dir = data_dir
+        self.patterns = patterns
+        self.sources = {}
+        self.players = {}
+        self.aliases = []
+        self.alias_keys = set()
+        self.postings = defaultdict(list)
+
+    def _source_files(self):
+        files = set()
+        for pattern in self.patterns:
+            files.update(glob.glob(os.path.join(self.data_dir, pattern)))
+        return {f: (os.stat(f).st_mtime, os.stat(f).st_size) for f in sorted(files)}
+
+    def refreshed(self):
+        """This index if its files are unchanged, otherwise an updated new index"""
+        if pq is None:
+            raise RuntimeError('pyarrow is not installed')
+        current = self._source_files()
+        if current == self.sources:
+            return self
+        if any(current.get(f) != sig for f, sig in self.sources.items()):
+            index = PlayerSearchIndex(self.data_dir, self.patterns)
+        else:
+            index = self._copy()
+        for path in current:
+            if path not in index.sources:
+                index._add_file(path, current[path])
+        return index
+
+    def _copy(self):
+        index = PlayerSearchIndex(self.data_dir, self.patterns)
+        index.sources = dict(self.sources)
+        index.players = dict(self.players)
+        index.aliases = list(self.aliases)
+        index.alias_keys = set(self.alias_keys)
+        index.postings = defaultdict(list, {gram: list(ids) for gram, ids in self.postings.items()})
+        return index
+
+    def describe(self):
+        return (f"{len(self.players)} players, {len(self.aliases)} aliases "
+                f"from {len(self.sources)} files")
+
+    def _add_file(self, path, signature):
+        rows = pq.read_table(path, columns=INDEX_COLUMNS).to_pylist()
+        # Weekly rosters repeat each player every week; newest rows win
+        rows.sort(key=lambda r: r['season'] or 0)
+        for row in rows:
+            key = row['gsis_id'] or f"{row['full_name']}|{row['team']}|{row['season']}"
+            record = self.players.get(key)
+            if record is None or (row['season'] or 0) >= record['season']:
+                self.players[key] = {
+                    'gsisId': row['gsis_id'] or None,
+                    'espnId': row['espn_id'] or (record or {}).get('espnId'),
+                    'sleeperId': row['sleeper_id'] or (record or {}).get('sleeperId'),
+                    'name': row['full_name'],
+                    'position': row['position'],
+                    'team': row['team'],
+                    'season': row['season'] or 0,
+                }
+            last = row['last_name'] or ''
+            for alias in (row['full_name'], f"{row['first_name']} {last}", f"{row['football_name']} {last}"):
+                self._add_alias(key, normalize_name(alias))
+        self.sources[path] = signature
+
+    def _add_alias(self, key, alias):
+        if not alias or (key, alias) in self.alias_keys:
+            return
+        self.alias_keys.add((key, alias))
+        index = len(self.aliases)
+        grams = trigrams(alias)
+        self.aliases.append((key, alias, frozenset(grams)))
+        for gram in grams:
+            self.postings[gram].append(index)
+
+    def search(self, query, limit=10, position=None):
+        """Ranked candidates for a free-text name, best first"""
+        normalized = normalize_name(query)
+        if len(normalized.replace(' ', '')) < MIN_QUERY_LENGTH:
+            return []
+        query_grams = trigrams(normalized)
+        # Rarest trigrams first, until their postings fill the scan budget; the
+        # common ones left over are only checked against the surviving candidates
+        present = sorted((g for g in query_grams if g in self.postings), key=lambda g: len(self.postings[g]))
+        scanned, budget = 0, MAX_POSTINGS_SCANNED
+        for gram in present:
+            budget -= len(self.postings[gram])
+            if budget < 0 and scanned:
+                break
+            scanned += 1
+        skipped = frozenset(present[scanned:])
+        counts = Counter(chain.from_iterable(self.postings[g] for g in present[:scanned]))
+
+        size = len(query_grams)
+        min_common = max(1, int(size * MIN_OVERLAP))
+        # Even sharing every skipped trigram, a candidate needs this many scanned ones
+        needed = min_common - len(skipped)
+        best = {}
+        for index, partial in counts.items():
+            if partial < needed:
+                continue
+            key, alias, alias_grams = self.aliases[index]
+            common = partial + len(skipped & alias_grams) if skipped else partial
+            if common < min_common:
+                continue
+            score = 2.0 * common / (size + len(alias_grams))
+            if score > best.get(key, (0.0,))[0]:
+                best[key] = (score, alias)
+
+        items = best.items()
+        if position:
+            items = [item for item in items if self.players[item[0]]['position'] == position]
+        ranked = heapq.nlargest(limit, items,
+                                key=lambda item: (item[1][0], self.players[item[0]]['season']))
+        return [dict(self.players[key], score=round(score, 4), matched=alias)
+                for key, (score, alias) in ranked]
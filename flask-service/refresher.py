@@ -0,0 +1,62 @@
+"""Background rebuilds for the in-memory nflverse tables.
+
+The player search index and the season aggregates are read on every request
+but only change when a parquet file in the cache directory does. A
+BackgroundRefresher owns one such table: a daemon thread calls the table's
+`refreshed()` every `interval` seconds, which returns the same object when
+nothing changed or a newly built one otherwise, and the new table is
+published with a single reference swap. Requests never build or lock
+anything; published tables are treated as immutable.
+"""
+import threading
+import time
+import traceback
+
+
+class BackgroundRefresher:
+    """Keeps `value` current by rebuilding it off the request path"""
+    def __init__(self, name, empty, interval=300.0):
+        self.name = name
+        self.value = empty
+        self.interval = interval
+        self.error = None
+        self.loaded = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f'{self.name}-refresher', daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            self.refresh()
+            time.sleep(self.interval)
+
+    def refresh(self):
+        """Rebuild once; failures are logged and leave the last good table published"""
+        started = time.monotonic()
+        try:
+            updated = self.value.refreshed()
+        except Exception as e:
+            self.error = e
+            print(f"{self.name}: refresh failed: {e!r}")
+            traceback.print_exc()
+        else:
+            self.error = None
+            if updated is not self.value:
+                self.value = updated
+                print(f"{self.name}: {updated.describe()} in {time.monotonic() - started:.2f}s")
+        finally:
+            self.loaded.set()
+
+    def get(self, timeout=None):
+        """The latest published table, waiting up to `timeout` for the first build"""
+        self.loaded.wait(timeout)
+        return self.value
+
+    def unavailable_reason(self, empty_message):
+        """Why the table is empty: still building, failed, or `empty_message`"""
+        if not self.loaded.is_set():
+            return f'{self.name} is still loading, please retry shortly'
+        if self.error is not None:
+            return f'{self.name} failed to load: {self.error}'
+        return empty_message
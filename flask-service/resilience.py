@@ -0,0 +1,258 @@
+"""Outbound rate limiting and circuit breaking for ESPN/Gemini calls.
+
+All upstream traffic from this service leaves from a single IP, so bursts of
+League constructions quickly get throttled by ESPN. Every outbound call goes
+through a per-host token bucket and a per-upstream circuit breaker so that a
+throttled upstream fails fast instead of being hammered further.
+"""
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+
+class UpstreamError(Exception):
+    """An upstream call failed or was refused locally; retrying later may succeed"""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamThrottled(UpstreamError):
+    """Upstream is rate limiting us (429, CDN 403, or local bucket exhausted)"""
+    pass
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Upstream is down or unreachable (connection error, timeout, 5xx)"""
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    """Circuit breaker is open - the call was not attempted"""
+    pass
+
+
+class UpstreamRejected(Exception):
+    """Upstream answered but refused the request (bad credentials, unknown league).
+
+    The upstream is healthy, so this counts as a success for the breaker.
+    """
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens/second up to `capacity`"""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self, tokens=1, timeout=0.0):
+        """Take `tokens`, waiting at most `timeout` seconds. Returns True on success."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Per-host token buckets shared by every outbound call in this process"""
+    def __init__(self, limits, default=(5.0, 10.0), max_wait=2.0):
+        self.limits = dict(limits)
+        self.default = default
+        self.max_wait = max_wait
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                rate, capacity = self.limits.get(host, self.default)
+                self.buckets[host] = TokenBucket(rate, capacity)
+            return self.buckets[host]
+
+    def acquire(self, url, tokens=1):
+        """Block until `tokens` are available for the url's host or raise UpstreamThrottled"""
+        host = urlparse(url).hostname or url
+        bucket = self.bucket(host)
+        if not bucket.acquire(tokens, timeout=self.max_wait):
+            raise UpstreamThrottled(
+                f"Outbound rate limit reached for {host}",
+                retry_after=max(1, int(tokens / bucket.rate)),
+            )
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failed calls.
+
+    Throttling, outages and unexpected errors all count as failures;
+    UpstreamRejected does not (see upstream_call).
+
+    While open, calls fail immediately with CircuitOpenError. After
+    `reset_timeout` seconds a single trial call is let through (half-open);
+    its outcome closes or re-opens the circuit. A trial that never reports
+    back is given up on after another `reset_timeout` and a new one admitted.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError if before_call() would, without admitting a trial"""
+        self._check(admit=False)
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not be attempted"""
+        self._check(admit=True)
+
+    def _check(self, admit):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN and now - self.trial_started >= self.reset_timeout:
+                # The trial call was lost without recording an outcome
+                self.state = self.OPEN
+                self.opened_at = self.trial_started
+            remaining = self.opened_at + self.reset_timeout - now
+            if self.state == self.OPEN and remaining <= 0:
+                if admit:
+                    self.state = self.HALF_OPEN
+                    self.trial_started = now
+                return
+            if self.state == self.HALF_OPEN:
+                remaining = self.trial_started + self.reset_timeout - now
+            raise CircuitOpenError(
+                f"{self.name} circuit is open - upstream calls are failing",
+                retry_after=max(1, int(remaining) + 1),
+            )
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker '{self.name}' opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+@contextmanager
+def upstream_call(breaker, url, tokens=1):
+    """Admit one outbound call through the limiter and breaker and record its outcome.
+
+    An open circuit is rejected before waiting on the limiter, so it fails
+    fast and leaves the bucket untouched; the half-open trial is only taken
+    once a token is in hand, so a local rate-limit rejection never consumes
+    it. Leaving the block normally or with UpstreamRejected records a
+    success; any other exception a failure.
+    """
+    breaker.allow()
+    rate_limiter.acquire(url, tokens)
+    breaker.before_call()
+    try:
+        yield
+    except UpstreamRejected:
+        breaker.record_success()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    else:
+        breaker.record_success()
+
+
+def is_throttle_error(e):
+    """Whether an espn-api exception is ESPN throttling us rather than an auth failure"""
+    message = str(e)
+    return '403' in message or 'Forbidden' in message or '429' in message
+
+
+def is_outage_error(e):
+    """Whether an espn-api exception means ESPN is down or unreachable"""
+    if isinstance(e, requests.RequestException):
+        return True
+    return re.search(r'HTTP 5\d\d', str(e)) is not None
+
+
+def is_throttle_response(resp):
+    """Tell rate limiting apart from real auth failures.
+
+    ESPN answers a genuine auth failure with a JSON error body, while its CDN
+    answers throttling with 429 or a 403 carrying an HTML block page.
+    """
+    if resp.status_code == 429:
+        return True
+    if resp.status_code == 403:
+        return 'json' not in resp.headers.get('Content-Type', '')
+    return resp.status_code == 503
+
+
+def parse_rate_limits(spec):
+    """Parse "host=rate:burst,host=rate:burst" into {host: (rate, burst)}"""
+    limits = {}
+    for item in filter(None, (s.strip() for s in spec.split(','))):
+        host, _, values = item.partition('=')
+        rate, _, burst = values.partition(':')
+        limits[host.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+DEFAULT_RATE_LIMITS = (
+    'fantasy.espn.com=5:10,'
+    'lm-api-reads.fantasy.espn.com=5:10,'
+    'generativelanguage.googleapis.com=2:5'
+)
+
+rate_limiter = RateLimiter(
+    parse_rate_limits(os.getenv('OUTBOUND_RATE_LIMITS', DEFAULT_RATE_LIMITS)),
+    max_wait=float(os.getenv('OUTBOUND_RATE_MAX_WAIT', 2.0)),
+)
+
+espn_breaker = CircuitBreaker(
+    'espn',
+    failure_threshold=int(os.getenv('ESPN_BREAKER_THRESHOLD', 5)),
+    reset_timeout=float(os.getenv('ESPN_BREAKER_RESET', 30)),
+)
+
+gemini_breaker = CircuitBreaker(
+    'gemini',
+    failure_threshold=int(os.getenv('GEMINI_BREAKER_THRESHOLD', 3)),
+    reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET', 30)),
+)
@@ -0,0 +1,203 @@
+"""Fast JSON encoding plus ETag/304 and compression for JSON responses.
+
+orjson is used for every jsonify() call when installed (the stdlib encoder
+otherwise). GET responses get a content-hash ETag so pollers sending
+If-None-Match receive a bodyless 304, and bodies above COMPRESS_MIN_SIZE are
+gzip/brotli compressed, reusing the compressed bytes for unchanged payloads.
+
+Player-list endpoints also accept `fields=` (projection) and
+`format=rows|columnar|msgpack|arrow` (one array per field; msgpack packs the
+columnar form, arrow sends an Arrow IPC stream of just the players) via
+parse_projection()/player_list().
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from metrics import timed, record_cache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional
+    pa = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_CACHE_SIZE = int(os.getenv('COMPRESS_CACHE_SIZE', 256))
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+CONDITIONAL_MIMETYPES = ('application/json', 'application/msgpack', ARROW_MIMETYPE)
+FORMATS = ('rows', 'columnar', 'msgpack', 'arrow')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson straight to bytes"""
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class CompressionCache:
+    """Small LRU of compressed bodies keyed by (etag, encoding)"""
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, compress, body):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                record_cache('compressed_body', True)
+                return self.entries[key]
+        record_cache('compressed_body', False)
+        data = compress(body)
+        with self.lock:
+            self.entries[key] = data
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return data
+
+
+compression_cache = CompressionCache(COMPRESS_CACHE_SIZE)
+
+ENCODERS = {'gzip': lambda body: gzip.compress(body, compresslevel=5)}
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=4)
+
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in ENCODERS and accepted[encoding]:
+            return encoding
+    return None
+
+
+def init_app(app):
+    """Install the orjson provider and the conditional/compression hook"""
+    app.json = OrjsonProvider(app)
+
+    @app.after_request
+    def _conditional_json(response):
+        if (response.status_code != 200 or response.mimetype not in CONDITIONAL_MIMETYPES
+                or response.direct_passthrough or 'Content-Encoding' in response.headers):
+            return response
+        with timed('etag_compress'):
+            body = response.get_data()
+            response.vary.add('Accept-Encoding')
+            etag = None
+            if request.method in ('GET', 'HEAD'):
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                response.set_etag(etag, weak=True)
+                if request.if_none_match.contains_weak(etag):
+                    response.status_code = 304
+                    response.set_data(b'')
+                    response.headers.pop('Content-Type', None)
+                    return response
+
+            encoding = choose_encoding() if len(body) >= COMPRESS_MIN_SIZE else None
+            if encoding:
+                compress = ENCODERS[encoding]
+                data = compression_cache.get((etag, encoding), compress, body) if etag else compress(body)
+                response.set_data(data)
+                response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def parse_projection(available):
+    """Read `fields` and `format` query args, raising ValueError for bad values"""
+    fields = list(available)
+    requested = request.args.get('fields')
+    if requested is not None:
+        fields = list(dict.fromkeys(f.strip() for f in requested.split(',') if f.strip()))
+        if not fields:
+            raise ValueError(f"No fields requested. Available: {', '.join(available)}")
+        unknown = [f for f in fields if f not in available]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    fmt = request.args.get('format', 'rows')
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Use {', '.join(FORMATS)}")
+    if (fmt == 'msgpack' and msgpack is None) or (fmt == 'arrow' and pa is None):
+        raise ValueError(f"{fmt} format is not available on this server")
+    return fields, fmt
+
+
+def project_rows(rows, fields):
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+
+def to_columnar(rows, fields):
+    """One array per field instead of repeating key names per player"""
+    return {'fields': fields, 'columns': [[row.get(f) for row in rows] for f in fields]}
+
+
+def to_arrow(rows, fields):
+    """Arrow IPC stream with one column per field"""
+    columns = {}
+    for f in fields:
+        values = [row.get(f) for row in rows]
+        try:
+            columns[f] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed types (e.g. an int id next to a string one) go over as strings
+            columns[f] = pa.array([None if v is None else str(v) for v in values])
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def player_list(rows, fields, fmt, wrap=None):
+    """Build the response for a player list in the requested shape.
+
+    `wrap` turns the shaped list into the endpoint's envelope (e.g. adding a
+    count); rows with every field are passed through untouched. Arrow
+    responses carry only the players, so `wrap` doesn't apply to them.
+    """
+    if fmt == 'arrow':
+        return current_app.response_class(to_arrow(rows, fields), mimetype=ARROW_MIMETYPE)
+    if fmt == 'rows':
+        shaped = rows if rows and set(fields) == set(rows[0]) else project_rows(rows, fields)
+    else:
+        shaped = to_columnar(rows, fields)
+    body = wrap(shaped) if wrap else shaped
+    if fmt == 'msgpack':
+        return current_app.response_class(msgpack.packb(body, use_bin_type=True),
+                                          mimetype='application/msgpack')
+    return jsonify(body)
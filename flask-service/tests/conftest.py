@@ -0,0 +1,57 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Service modules are imported top-level (`import resilience`), as gunicorn does from flask-service/
+sys.path.insert(0, SERVICE_DIR)
+
+ESPN_HEADERS = {
+    'X-ESPN-S2': 'test-espn-s2',
+    'X-ESPN-SWID': '{TEST-SWID}',
+    'X-ESPN-LEAGUE-ID': '1',
+    'X-ESPN-TEAM-ID': '1',
+    'X-ESPN-YEAR': '2025',
+}
+
+
+@pytest.fixture(scope='session')
+def espn_stub(tmp_path_factory):
+    """ESPN stub server; tests flip `espn_stub.RequestHandlerClass.throttle_status`"""
+    from bench.stubs import EspnStubHandler, serve, synthetic_fixtures
+    server = serve(EspnStubHandler, 0, synthetic_fixtures(free_agents=300), 0, 0)
+    os.environ['ESPN_API_BASE'] = f'http://127.0.0.1:{server.server_address[1]}/apis/v3/games'
+    os.environ['NFLVERSE_CACHE_DIR'] = str(tmp_path_factory.mktemp('nflverse_cache'))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def gemini_stub():
+    from bench.stubs import GeminiStubHandler, serve, synthetic_fixtures
+    server = serve(GeminiStubHandler, 0, synthetic_fixtures(), 0, 0)
+    os.environ['GEMINI_API_BASE'] = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ.setdefault('GEMINI_API_KEY', 'test-key')
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def app_module(espn_stub, gemini_stub):
+    return importlib.import_module('app')
+
+
+@pytest.fixture
+def client(app_module, espn_stub):
+    """Test client with a closed breaker, full buckets and a healthy stub"""
+    import resilience
+    handler = espn_stub.RequestHandlerClass
+    handler.throttle_status, handler.throttle_every, handler.request_count = None, 1, 0
+    for breaker in (resilience.espn_breaker, resilience.gemini_breaker):
+        breaker.record_success()
+    resilience.rate_limiter.buckets.clear()
+    app_module.league_cache.clear()
+    return app_module.app.test_client()
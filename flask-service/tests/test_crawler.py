@@ -0,0 +1,65 @@
+import json
+
+from crawler import FreeAgentCrawler
+from tests.conftest import ESPN_HEADERS
+
+
+def crawl(fetch_page, **kwargs):
+    crawler = FreeAgentCrawler(fetch_page, to_row=lambda entry: entry, page_size=10,
+                               max_workers=2, slots=(0, 2), **kwargs)
+    crawler.start().wait(timeout=5)
+    return crawler
+
+
+def test_lanes_stop_at_a_short_page():
+    pool = {slot: [{'playerId': slot * 1000 + i, 'position': slot} for i in range(25)] for slot in (0, 2)}
+    crawler = crawl(lambda slot, offset, limit: pool[slot][offset:offset + limit])
+    assert crawler.pages == 6
+    assert len(crawler.snapshot()) == 50
+
+
+def test_lane_stops_when_offset_is_ignored():
+    calls = []
+
+    def fetch_page(slot, offset, limit):
+        calls.append((slot, offset))
+        return [{'playerId': slot * 1000 + i, 'position': slot} for i in range(limit)]
+
+    crawler = crawl(fetch_page)
+    # First page is new, the repeat of it adds nothing, so each lane stops after two
+    assert len(calls) == 4
+    assert len(crawler.snapshot()) == 20
+
+
+def test_lane_page_cap():
+    def fetch_page(slot, offset, limit):
+        return [{'playerId': (slot, offset + i), 'position': slot} for i in range(limit)]
+
+    crawler = crawl(fetch_page, max_pages=3)
+    assert crawler.pages == 6
+
+
+def test_stream_applies_position_filter(client):
+    resp = client.get('/api/espn/free-agents?scan=full&stream=1&position=QB&fields=name,position',
+                      headers=ESPN_HEADERS)
+    lines = [json.loads(line) for line in resp.data.decode().splitlines()]
+    players = [p for line in lines for p in line['players']]
+    assert lines[-1]['done'] and lines[-1]['count'] == len(players) > 0
+    assert {p['position'] for p in players} == {'QB'}
+    assert all(list(p) == ['name', 'position'] for p in players)
+
+
+def test_stream_rejects_size_and_non_row_formats(client):
+    for query in ('format=msgpack', 'format=columnar', 'size=10'):
+        resp = client.get(f'/api/espn/free-agents?scan=full&stream=1&{query}', headers=ESPN_HEADERS)
+        assert resp.status_code == 400
+
+
+def test_cached_crawl_skips_league_construction(client, espn_stub):
+    url = '/api/espn/free-agents?scan=full&fields=name'
+    first = client.get(url, headers=ESPN_HEADERS)
+    assert first.status_code == 200
+    espn_stub.RequestHandlerClass.request_count = 0
+    second = client.get(url, headers=ESPN_HEADERS)
+    assert second.get_json() == first.get_json()
+    assert espn_stub.RequestHandlerClass.request_count == 0
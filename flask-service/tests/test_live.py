@@ -0,0 +1,48 @@
+import threading
+
+from tests.conftest import ESPN_HEADERS
+
+
+def sse_events(resp):
+    return [block for block in resp.data.decode().split('\n\n') if block]
+
+
+def test_sse_stream_ends_at_max_seconds(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'LIVE_SSE_MAX_SECONDS', 0.2)
+    resp = client.get('/api/espn/live?stream=sse', headers=ESPN_HEADERS)
+    events = sse_events(resp)
+    assert resp.mimetype == 'text/event-stream'
+    assert events[0].startswith('id: ') and 'event: delta' in events[0]
+    assert app_module.live_sse_slots.acquire(blocking=False)
+    app_module.live_sse_slots.release()
+
+
+def test_sse_over_capacity_sends_one_delta_and_retry(client, app_module, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(app_module, 'live_sse_slots', slots)
+    events = sse_events(client.get('/api/espn/live?stream=sse', headers=ESPN_HEADERS))
+    assert events[0].startswith('retry: ')
+    assert len(events) == 2 and 'event: delta' in events[1]
+
+
+def test_week_rollover_starts_a_new_epoch(client, app_module, espn_stub, monkeypatch):
+    monkeypatch.setattr(app_module, 'LIVE_LEAGUE_MAX_AGE', 0)
+    monkeypatch.setattr(app_module, 'LIVE_REFRESH_INTERVAL', 0)
+    app_module.live_states.clear()
+    league = espn_stub.RequestHandlerClass.fixtures['league']
+    first = client.get('/api/espn/live', headers=ESPN_HEADERS).get_json()
+    state = next(iter(app_module.live_states.values()))
+    assert state.league.current_week == league['scoringPeriodId']
+
+    same_week = client.get(f"/api/espn/live?since={first['version']}&epoch={first['epoch']}",
+                           headers=ESPN_HEADERS).get_json()
+    assert same_week['epoch'] == first['epoch'] and not same_week['full']
+
+    monkeypatch.setitem(league, 'scoringPeriodId', league['scoringPeriodId'] + 1)
+    monkeypatch.setitem(league['status'], 'currentMatchupPeriod', league['status']['currentMatchupPeriod'] + 1)
+    rolled = client.get(f"/api/espn/live?since={same_week['version']}&epoch={same_week['epoch']}",
+                        headers=ESPN_HEADERS).get_json()
+    assert rolled['epoch'] != first['epoch'] and rolled['full']
+    assert state.league.current_week == league['scoringPeriodId']
+    app_module.live_states.clear()
@@ -0,0 +1,49 @@
+import re
+
+from metrics import Histogram
+from tests.conftest import ESPN_HEADERS
+
+
+def test_roster_server_timing_has_every_phase(client):
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 200
+    timing = resp.headers['Server-Timing']
+    for phase in ('espn_preflight', 'league_init', 'transform', 'total'):
+        assert re.search(rf'(^|, ){phase};dur=\d+\.\d', timing), timing
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_seconds', 'Test', labels=('endpoint',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, 'roster')
+    lines = histogram.render()
+    assert 'test_seconds_bucket{endpoint="roster",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{endpoint="roster",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{endpoint="roster",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{endpoint="roster"} 6.05' in lines
+    assert 'test_seconds_count{endpoint="roster"} 4' in lines
+
+
+def test_metrics_endpoint_renders_histograms_and_cache_counters(client, monkeypatch):
+    import responses
+    monkeypatch.setattr(responses, 'COMPRESS_MIN_SIZE', 0)
+    monkeypatch.setattr(responses, 'compression_cache', responses.CompressionCache(8))
+    for _ in range(2):
+        client.get('/api/espn/roster', headers=dict(ESPN_HEADERS, **{'Accept-Encoding': 'gzip'}))
+    resp = client.get('/metrics')
+    assert resp.mimetype == 'text/plain'
+    text = resp.get_data(as_text=True)
+
+    prefix = 'flask_request_duration_seconds_bucket{endpoint="get_my_roster",status="200",le="'
+    buckets = [int(line.rsplit(' ', 1)[1]) for line in text.splitlines() if line.startswith(prefix)]
+    assert buckets and buckets == sorted(buckets)
+    count = re.search(r'^flask_request_duration_seconds_count\{endpoint="get_my_roster",status="200"\} (\d+)$',
+                      text, re.M)
+    assert count and int(count.group(1)) == buckets[-1]
+    assert re.search(r'^flask_request_duration_seconds_sum\{endpoint="get_my_roster",status="200"\} [\d.e-]+$',
+                     text, re.M)
+    assert re.search(r'^flask_phase_duration_seconds_count\{endpoint="get_my_roster",phase="league_init"\} \d+$',
+                     text, re.M)
+    for result in ('hit', 'miss'):
+        assert re.search(rf'^flask_cache_events_total\{{cache="compressed_body",result="{result}"\}} \d+$',
+                         text, re.M)
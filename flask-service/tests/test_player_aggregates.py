@@ -0,0 +1,70 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from player_aggregates import WEEKLY_COLUMNS, PlayerAggregates
+
+
+def week_row(player_id, week, team='MIN', targets=0, carries=0, points=0.0, receptions=0, season=2024):
+    row = dict.fromkeys(WEEKLY_COLUMNS, 0)
+    row.update(player_id=player_id, player_display_name=player_id, position='WR', team=team,
+               season=season, week=week, season_type='REG', targets=targets, carries=carries,
+               receptions=receptions, fantasy_points=points, fantasy_points_ppr=points + receptions)
+    return row
+
+
+def write_season(directory, season, rows):
+    path = os.path.join(directory, f'player_stats_weekly_{season}.parquet')
+    pq.write_table(pa.Table.from_pylist(rows), path)
+    return path
+
+
+def test_season_aggregates_and_rolling_windows(tmp_path):
+    rows = [week_row('wr1', w, targets=6, points=10.0, receptions=4) for w in range(1, 7)]
+    rows += [week_row('rb1', w, targets=4, carries=20, points=w * 1.0) for w in range(1, 7)]
+    rows.append(dict(week_row('wr1', 19), season_type='POST'))
+    write_season(tmp_path, 2024, rows)
+
+    record = PlayerAggregates(str(tmp_path)).refreshed().get('wr1', 2024)
+    assert record['games'] == 6
+    assert record['targetShare'] == 0.6 and record['carryShare'] == 0.0
+    assert record['fantasyPoints']['ppr'] == 84.0 and record['fantasyPoints']['halfPpr'] == 72.0
+    assert record['rolling']['last3']['games'] == 3
+    assert record['rolling']['last3']['fantasyPoints']['standardPerGame'] == 10.0
+    assert record['ngs'] is None
+
+
+def test_only_changed_seasons_are_recomputed(tmp_path):
+    write_season(tmp_path, 2023, [week_row('wr1', 1, season=2023, points=5.0)])
+    path = write_season(tmp_path, 2024, [week_row('wr1', 1, points=7.0)])
+    table = PlayerAggregates(str(tmp_path)).refreshed()
+    assert table.refreshed() is table
+
+    write_season(tmp_path, 2024, [week_row('wr1', 1, points=9.0), week_row('wr1', 2, points=9.0)])
+    os.utime(path, (1, 1))
+    updated = table.refreshed()
+    assert updated.seasons[2023] is table.seasons[2023]
+    assert updated.get('wr1', 2024)['games'] == 2
+    assert table.get('wr1', 2024)['games'] == 1
+    assert [s['season'] for s in updated.seasons_for('wr1')] == [2024, 2023]
+
+
+def test_ngs_is_volume_weighted(tmp_path):
+    write_season(tmp_path, 2024, [week_row('wr1', 1), week_row('wr1', 2)])
+    ngs = [{'season': 2024, 'season_type': 'REG', 'week': week, 'player_gsis_id': 'wr1',
+            'targets': targets, 'avg_separation': separation, 'avg_cushion': 5.0,
+            'avg_intended_air_yards': 10.0, 'catch_percentage': 60.0, 'avg_yac_above_expectation': 0.0}
+           for week, targets, separation in ((0, 99, 9.9), (1, 3, 2.0), (2, 1, 4.0))]
+    pq.write_table(pa.Table.from_pylist(ngs), tmp_path / 'ngs_receiving.parquet')
+    table = PlayerAggregates(str(tmp_path)).refreshed()
+    assert table.get('wr1', 2024)['ngs']['avgSeparation'] == 2.5
+
+
+def test_aggregates_endpoint(client, app_module, tmp_path, monkeypatch):
+    write_season(tmp_path, 2024, [week_row('00-0036322', 1, targets=10, points=20.0)])
+    monkeypatch.setattr(app_module.player_aggregates, 'value', PlayerAggregates(str(tmp_path)).refreshed())
+    body = client.get('/api/players/00-0036322/aggregates?season=2024').get_json()
+    assert body['seasons'][0]['fantasyPoints']['standard'] == 20.0
+    assert client.get('/api/players/unknown/aggregates').status_code == 404
+    assert client.get('/api/players/00-0036322/aggregates?season=x').status_code == 400
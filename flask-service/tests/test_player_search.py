@@ -0,0 +1,91 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from player_search import INDEX_COLUMNS, PlayerSearchIndex, normalize_name
+from refresher import BackgroundRefresher
+
+
+def write_roster(path, season, players):
+    rows = [dict(zip(INDEX_COLUMNS, (season, team, position, full, first, last, first, gsis, None, None)))
+            for gsis, full, first, last, team, position in players]
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+def roster_dir(tmp_path):
+    write_roster(tmp_path / 'roster_2023.parquet', 2023, [
+        ('00-1', 'Michael Pittman Jr.', 'Michael', 'Pittman', 'IND', 'WR'),
+        ('00-2', 'Patrick Mahomes', 'Patrick', 'Mahomes', 'KC', 'QB'),
+    ])
+    return tmp_path
+
+
+def test_normalize_name():
+    assert normalize_name('Mike Pittman Jr') == normalize_name('Michael Pittman') == 'michael pittman'
+    assert normalize_name('A.J. Brown') == 'aj brown'
+
+
+def test_refreshed_copies_instead_of_mutating(tmp_path):
+    index = PlayerSearchIndex(str(roster_dir(tmp_path))).refreshed()
+    assert index.search('mike pitman')[0]['gsisId'] == '00-1'
+    assert index.refreshed() is index
+
+    write_roster(tmp_path / 'roster_2024.parquet', 2024, [
+        ('00-3', 'Brock Bowers', 'Brock', 'Bowers', 'LV', 'TE'),
+    ])
+    updated = index.refreshed()
+    assert updated is not index
+    assert updated.search('brock bowers')[0]['gsisId'] == '00-3'
+    assert not index.search('brock bowers', position='TE')
+    assert len(updated.sources) == 2 and len(index.sources) == 1
+
+
+def test_changed_file_rebuilds(tmp_path):
+    index = PlayerSearchIndex(str(roster_dir(tmp_path))).refreshed()
+    write_roster(tmp_path / 'roster_2023.parquet', 2023, [
+        ('00-2', 'Patrick Mahomes', 'Patrick', 'Mahomes', 'KC', 'QB'),
+    ])
+    os.utime(tmp_path / 'roster_2023.parquet', (1, 1))
+    updated = index.refreshed()
+    assert set(updated.players) == {'00-2'}
+
+
+def test_refresher_publishes_and_reports_failures(tmp_path):
+    refresher = BackgroundRefresher('Test index', PlayerSearchIndex(str(tmp_path)))
+    refresher.refresh()
+    assert not refresher.get().sources
+    assert 'no roster files' in refresher.unavailable_reason('no roster files')
+
+    (tmp_path / 'roster_2023.parquet').write_bytes(b'not parquet')
+    refresher.refresh()
+    assert refresher.error is not None
+    assert 'failed to load' in refresher.unavailable_reason('no roster files')
+
+    roster_dir(tmp_path)
+    refresher.refresh()
+    assert refresher.error is None and refresher.get().search('mahomes')[0]['gsisId'] == '00-2'
+
+
+def test_short_queries_are_not_ranked(tmp_path, client):
+    index = PlayerSearchIndex(str(roster_dir(tmp_path))).refreshed()
+    assert index.search('pa') == []
+    assert index.search('pat')[0]['gsisId'] == '00-2'
+    assert client.get('/api/players/search?q=jo').status_code == 400
+
+
+def test_common_trigrams_do_not_hide_matches(tmp_path, monkeypatch):
+    import player_search
+    monkeypatch.setattr(player_search, 'MAX_POSTINGS_SCANNED', 20)
+    players = [(f'00-{i}', f'John Doe{i}', 'John', f'Doe{i}', 'KC', 'WR') for i in range(100, 200)]
+    players.append(('00-9', 'Johnny Jones', 'Johnny', 'Jones', 'KC', 'WR'))
+    write_roster(tmp_path / 'roster_2023.parquet', 2023, players)
+    index = PlayerSearchIndex(str(tmp_path)).refreshed()
+    assert index.search('john jones')[0]['gsisId'] == '00-9'
+    assert index.search('john doe150')[0]['gsisId'] == '00-150'
+
+
+def test_search_endpoint_reports_empty_index(client):
+    resp = client.get('/api/players/search?q=mahomes')
+    assert resp.status_code == 503
+    assert 'no roster parquet files' in resp.get_json()['error']
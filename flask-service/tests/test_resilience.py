@@ -0,0 +1,229 @@
+import time
+
+import pytest
+import requests
+
+from resilience import (
+    CircuitBreaker, CircuitOpenError, RateLimiter, TokenBucket, UpstreamRejected,
+    UpstreamThrottled, UpstreamUnavailable, is_outage_error, is_throttle_response,
+    parse_rate_limits, upstream_call,
+)
+from tests.conftest import ESPN_HEADERS
+
+
+def response(status, content_type='application/json'):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers['Content-Type'] = content_type
+    return resp
+
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0.1)
+
+
+def test_rate_limiter_raises_with_retry_after():
+    limiter = RateLimiter(parse_rate_limits('example.com=1:1'), max_wait=0)
+    limiter.acquire('https://example.com/a')
+    with pytest.raises(UpstreamThrottled) as exc:
+        limiter.acquire('https://example.com/b')
+    assert exc.value.retry_after == 1
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after >= 1
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_lost_trial_does_not_wedge_half_open():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.before_call()  # trial admitted but never reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_limiter_rejection_does_not_consume_trial(monkeypatch):
+    import resilience
+    monkeypatch.setattr(resilience, 'rate_limiter',
+                        RateLimiter(parse_rate_limits('example.com=1:1'), max_wait=0))
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with upstream_call(breaker, 'https://example.com/'):
+        pass
+    assert breaker.state == CircuitBreaker.CLOSED
+    with pytest.raises(UpstreamThrottled):
+        with upstream_call(breaker, 'https://example.com/'):
+            pass
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_open_breaker_fails_fast_and_leaves_the_bucket_full(monkeypatch):
+    import resilience
+    limiter = RateLimiter(parse_rate_limits('example.com=0.5:1'), max_wait=5)
+    monkeypatch.setattr(resilience, 'rate_limiter', limiter)
+    limiter.acquire('https://example.com/')  # drain: a limiter wait would take 2s
+    breaker = open_breaker(reset_timeout=30)
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        with upstream_call(breaker, 'https://example.com/'):
+            pass
+    assert time.monotonic() - started < 0.1
+
+    full = RateLimiter(parse_rate_limits('example.com=1:1'), max_wait=5)
+    monkeypatch.setattr(resilience, 'rate_limiter', full)
+    with pytest.raises(CircuitOpenError):
+        with upstream_call(breaker, 'https://example.com/'):
+            pass
+    assert full.bucket('example.com').tokens == 1
+
+
+def test_allow_does_not_admit_the_trial():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+@pytest.mark.parametrize('error, state', [
+    (UpstreamRejected('bad cookies'), CircuitBreaker.CLOSED),
+    (UpstreamThrottled('429'), CircuitBreaker.OPEN),
+    (UpstreamUnavailable('502'), CircuitBreaker.OPEN),
+    (ValueError('unexpected'), CircuitBreaker.OPEN),
+])
+def test_upstream_call_records_every_outcome(monkeypatch, error, state):
+    import resilience
+    monkeypatch.setattr(resilience, 'rate_limiter', RateLimiter({}, default=(1000, 1000)))
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(type(error)):
+        with upstream_call(breaker, 'https://example.com/'):
+            raise error
+    assert breaker.state == state
+
+
+@pytest.mark.parametrize('status, content_type, throttled', [
+    (429, 'application/json', True),
+    (503, 'text/html', True),
+    (403, 'text/html', True),
+    (403, 'application/json; charset=UTF-8', False),
+    (401, 'application/json', False),
+    (404, 'application/json', False),
+    (200, 'application/json', False),
+])
+def test_is_throttle_response(status, content_type, throttled):
+    assert is_throttle_response(response(status, content_type)) is throttled
+
+
+@pytest.mark.parametrize('status', [429, 403])
+def test_throttled_espn_maps_to_503_with_retry_after(client, espn_stub, status):
+    espn_stub.RequestHandlerClass.throttle_status = status
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 503
+    assert resp.get_json()['throttled'] is True
+    assert resp.headers['Retry-After'] == ('7' if status == 429 else '30')
+
+
+@pytest.mark.parametrize('error, outage', [
+    (requests.ConnectionError('Connection refused'), True),
+    (Exception('ESPN returned an HTTP 502'), True),
+    (Exception('ESPN returned an HTTP 429'), False),
+    (Exception('League 1 does not exist'), False),
+])
+def test_is_outage_error(error, outage):
+    assert is_outage_error(error) is outage
+
+
+def test_outage_maps_to_503_without_throttled(client, espn_stub):
+    espn_stub.RequestHandlerClass.throttle_status = 500
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 503
+    body = resp.get_json()
+    assert body['unavailable'] is True and body['throttled'] is False
+    assert 'unavailable' in body['error'] and 'rate limiting' not in body['error']
+
+
+def test_unreachable_espn_is_an_outage(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'ESPN_PREFLIGHT_BASE', 'http://127.0.0.1:9/apis/v3/games')
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 503 and resp.get_json()['unavailable'] is True
+
+
+def test_outage_serves_the_stale_league(client, espn_stub):
+    assert client.get('/api/espn/roster', headers=ESPN_HEADERS).status_code == 200
+    espn_stub.RequestHandlerClass.throttle_status = 502
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 200 and resp.get_json()
+
+
+def test_auth_failure_is_not_reported_as_throttling(client, espn_stub):
+    import resilience
+    espn_stub.RequestHandlerClass.throttle_status = 401
+    for _ in range(resilience.espn_breaker.failure_threshold + 1):
+        resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+        assert resp.status_code == 401
+    assert resilience.espn_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_and_recovers_through_the_app(client, espn_stub, monkeypatch):
+    import resilience
+    breaker = resilience.espn_breaker
+    monkeypatch.setattr(breaker, 'reset_timeout', 0.05)
+    espn_stub.RequestHandlerClass.throttle_status = 429
+    for _ in range(breaker.failure_threshold):
+        client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 503 and resp.get_json()['circuitOpen'] is True
+
+    espn_stub.RequestHandlerClass.throttle_status = None
+    time.sleep(0.06)
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    assert resp.status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
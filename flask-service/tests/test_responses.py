@@ -0,0 +1,104 @@
+import gzip
+
+import brotli
+import msgpack
+import pyarrow as pa
+import pytest
+
+from tests.conftest import ESPN_HEADERS
+
+
+def test_duplicate_fields_are_projected_once(client):
+    resp = client.get('/api/espn/roster?fields=name,name,name,name,name,name,name,name',
+                      headers=ESPN_HEADERS)
+    assert resp.status_code == 200
+    rows = resp.get_json()
+    assert rows and all(list(row) == ['name'] for row in rows)
+
+
+def test_all_fields_in_any_order_pass_through(client, app_module):
+    fields = ','.join(reversed(app_module.ROSTER_FIELDS))
+    rows = client.get(f'/api/espn/roster?fields={fields}', headers=ESPN_HEADERS).get_json()
+    assert set(rows[0]) == set(app_module.ROSTER_FIELDS)
+
+
+def test_unknown_field_and_format_are_rejected(client):
+    assert client.get('/api/espn/roster?fields=name,salary', headers=ESPN_HEADERS).status_code == 400
+    assert client.get('/api/espn/roster?format=xml', headers=ESPN_HEADERS).status_code == 400
+
+
+@pytest.mark.parametrize('fields', ['', ',', ' , ,'])
+def test_empty_projection_is_rejected(client, fields):
+    resp = client.get(f'/api/espn/free-agents?fields={fields}', headers=ESPN_HEADERS)
+    assert resp.status_code == 400
+    assert resp.get_json()['error'].startswith('No fields requested')
+
+
+def test_columnar_msgpack_and_arrow_agree(client):
+    base = '/api/espn/free-agents?size=20&fields=name,percentOwned'
+    columnar = client.get(base + '&format=columnar', headers=ESPN_HEADERS).get_json()['players']
+    packed = msgpack.unpackb(client.get(base + '&format=msgpack', headers=ESPN_HEADERS).data)['players']
+    resp = client.get(base + '&format=arrow', headers=ESPN_HEADERS)
+    assert resp.mimetype == 'application/vnd.apache.arrow.stream'
+    table = pa.ipc.open_stream(resp.data).read_all()
+    assert packed == columnar
+    assert table.column_names == columnar['fields']
+    assert [table.column(f).to_pylist() for f in table.column_names] == columnar['columns']
+
+
+PLAYER = {'name': 'Player', 'position': 'WR', 'proTeam': 'KC', 'projectedPoints': 12.0,
+          'points': 10.0, 'lineupSlot': 'WR'}
+
+
+def test_etag_and_not_modified(client):
+    resp = client.get('/api/espn/roster', headers=ESPN_HEADERS)
+    etag, weak = resp.get_etag()
+    assert etag and weak and resp.headers['ETag'].startswith('W/')
+    again = client.get('/api/espn/roster', headers=dict(ESPN_HEADERS, **{'If-None-Match': resp.headers['ETag']}))
+    assert again.status_code == 304
+    assert again.data == b'' and 'Content-Type' not in again.headers
+
+
+@pytest.mark.parametrize('encoding, decompress', [('gzip', gzip.decompress), ('br', brotli.decompress)])
+def test_compression_threshold(client, monkeypatch, encoding, decompress):
+    import responses
+    headers = dict(ESPN_HEADERS, **{'Accept-Encoding': encoding})
+    body = client.get('/api/espn/roster', headers=ESPN_HEADERS).data
+
+    monkeypatch.setattr(responses, 'COMPRESS_MIN_SIZE', len(body) + 1)
+    resp = client.get('/api/espn/roster', headers=headers)
+    assert 'Content-Encoding' not in resp.headers and resp.data == body
+
+    monkeypatch.setattr(responses, 'COMPRESS_MIN_SIZE', len(body))
+    resp = client.get('/api/espn/roster', headers=headers)
+    assert resp.headers['Content-Encoding'] == encoding
+    assert decompress(resp.data) == body
+
+
+def test_post_and_errors_get_no_etag(client, monkeypatch):
+    import responses
+    monkeypatch.setattr(responses, 'COMPRESS_MIN_SIZE', 0)
+    resp = client.post('/api/espn/ai-start-sit', json={'playerA': PLAYER, 'playerB': PLAYER},
+                       headers={'If-None-Match': '*'})
+    assert resp.status_code == 200
+    assert 'ETag' not in resp.headers
+
+    resp = client.get('/api/espn/roster?fields=salary',
+                      headers=dict(ESPN_HEADERS, **{'Accept-Encoding': 'gzip'}))
+    assert resp.status_code == 400
+    assert 'ETag' not in resp.headers and 'Content-Encoding' not in resp.headers
+    assert resp.get_json()['error'].startswith('Unknown fields')
+
+
+def test_repeated_etag_reuses_compressed_body(client, monkeypatch):
+    import responses
+    from metrics import cache_events
+    monkeypatch.setattr(responses, 'COMPRESS_MIN_SIZE', 0)
+    monkeypatch.setattr(responses, 'compression_cache', responses.CompressionCache(8))
+    headers = dict(ESPN_HEADERS, **{'Accept-Encoding': 'gzip'})
+    hits = cache_events.values.get(('compressed_body', 'hit'), 0)
+    first = client.get('/api/espn/roster', headers=headers)
+    second = client.get('/api/espn/roster', headers=headers)
+    assert first.headers['ETag'] == second.headers['ETag'] and second.data == first.data
+    assert cache_events.values[('compressed_body', 'hit')] == hits + 1
+    assert list(responses.compression_cache.entries) == [(first.get_etag()[0], 'gzip')]
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from bench.stubs import ESPN_FIXTURE_FILES, GEMINI_RESPONSE, load_fixtures, synthetic_fixtures
+
+
+def record(path, fixtures, names):
+    for name in names:
+        (path / f'{name}.json').write_text(json.dumps(fixtures[name]))
+
+
+def test_recorded_fixtures_are_not_mixed_with_synthetic_ones(tmp_path):
+    fixtures = synthetic_fixtures(teams=2, free_agents=10, seed=3)
+    record(tmp_path, fixtures, [n for n in ESPN_FIXTURE_FILES if n != 'box_scores'])
+    with pytest.raises(FileNotFoundError, match='box_scores.json'):
+        load_fixtures(str(tmp_path))
+
+
+def test_gemini_falls_back_to_the_canned_response(tmp_path):
+    fixtures = synthetic_fixtures(teams=2, free_agents=10, seed=3)
+    record(tmp_path, fixtures, ESPN_FIXTURE_FILES)
+    loaded = load_fixtures(str(tmp_path))
+    assert loaded['gemini'] is GEMINI_RESPONSE
+    assert loaded['box_scores'] == fixtures['box_scores']
+
+    recorded = {'candidates': [{'content': {'parts': [{'text': 'RECOMMENDATION: B'}]}}]}
+    (tmp_path / 'gemini.json').write_text(json.dumps(recorded))
+    assert load_fixtures(str(tmp_path))['gemini'] == recorded